@@ -1,62 +1,540 @@
 """
 API endpoints for Executive Dashboard
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+import math
+import time
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
-from ..models.executive_metrics import ExecutiveDashboardResponse
+from pydantic_core import to_json
+from ..config.settings import settings
+from ..models.executive_metrics import (
+    ComplianceFramework,
+    ExecutiveDashboardResponse,
+    ExecutiveDashboardSections,
+    MetricsComparison,
+    RiskItem,
+    SeverityData,
+    SeverityDataColumns,
+    TrendDataColumns,
+    TrendDataPoint,
+    UniqueCounts
+)
+from ..services.admission import AdmissionController, AdmissionRejected
 from ..services.bigquery_service import bigquery_service
-from ..services.data_transformer import data_transformer
+from ..services.data_transformer import COLUMNAR_SECTIONS, DASHBOARD_SECTIONS, data_transformer, datasets_for_sections
+from ..services.dashboard_snapshot import DashboardSnapshot, compute_etag, etag_matches
+from ..services.deadline import Deadline
+from ..services.json_encoder import dumps as dumps_json
+from ..services.metrics import metrics_registry
+from ..services.result_cache import ResultCache
+from ..services.server_timing import ServerTiming
+from ..services.single_flight import SingleFlight
 
 router = APIRouter(prefix="/api/executive", tags=["Executive Dashboard"])
 
-@router.get("/dashboard", response_model=ExecutiveDashboardResponse)
+# Most windows a single batch request may ask for
+MAX_BATCH_WINDOWS = 8
+
+# Marks responses built while the warehouse circuit breaker was open
+STALE_WARNING = '110 - "Response is Stale"'
+
+# Longest window a minute-granularity trend may cover
+MINUTE_TREND_MAX_DAYS = 7
+
+# Short names accepted by `fields=` in addition to the response field names
+SECTION_ALIASES = {'trend': 'trend_data', 'severity': 'severity_data'}
+
+# Serialized dashboard responses, reused while fresh so repeat polls skip
+# BigQuery and serialization entirely
+dashboard_snapshots = ResultCache(
+    ttl_seconds=settings.cache_ttl_seconds,
+    max_entries=settings.cache_max_entries,
+    stale_while_revalidate=settings.cache_stale_while_revalidate,
+    max_stale_seconds=settings.cache_max_stale_seconds
+) if settings.cache_enabled else None
+
+# Coalesces identical concurrent snapshot builds, so they share one admission slot and one build
+snapshot_builds = SingleFlight()
+
+# Limits how much warehouse work snapshot builds may run at once; cache hits bypass it
+admission = AdmissionController(
+    max_cost=settings.admission_max_cost,
+    max_queued_cost=settings.admission_max_queued_cost
+) if settings.admission_enabled else None
+if admission is not None:
+    metrics_registry.register_collector(admission.collect_metrics)
+
+@router.get("/dashboard", response_model=Union[ExecutiveDashboardResponse, ExecutiveDashboardSections])
 async def get_executive_dashboard(
-    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze")
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    periods: Optional[int] = Query(default=2, ge=2, le=12, description="Number of consecutive periods in the metrics history"),
+    fields: Optional[str] = Query(
+        default=None,
+        description="Comma-separated sections to include: metrics, trend_data, severity_data, risks, compliance (default: all)"
+    ),
+    granularity: str = Query(default="day", pattern="^(minute|hour|day)$", description="Trend bucket width: minute, hour or day"),
+    layout: str = Query(default="rows", pattern="^(rows|columnar)$", description="Trend/severity shape: rows (list of points) or columnar (parallel arrays)"),
+    if_none_match: Optional[str] = Header(default=None)
 ):
     """
     Get complete executive dashboard data
 
+    Responses carry an ETag derived from the underlying data; a request whose
+    If-None-Match matches the current snapshot gets 304 Not Modified. With
+    `fields`, only the listed sections are returned and only the BigQuery
+    queries they need are run.
+
     Args:
         days: Number of days to look back (default: 30)
+        periods: Number of consecutive periods in the metrics history (default: 2)
+        fields: Comma-separated sections to include (default: all)
+        granularity: Trend bucket width (default: day)
+        layout: Shape of trend_data and severity_data (default: rows)
+        if_none_match: ETag of the snapshot the client already holds
+
+    Returns:
+        Complete executive dashboard metrics and visualizations (only the
+        requested sections with `fields`)
+    """
+    return await _serve_sections(
+        days, periods, _parse_fields(fields), if_none_match, granularity=granularity, layout=layout
+    )
+
+@router.get("/dashboard/batch", response_model=Dict[str, ExecutiveDashboardResponse])
+async def get_executive_dashboard_batch(
+    windows: str = Query(default="7,30,90,365", description="Comma-separated `days` windows, each 1-365"),
+    periods: Optional[int] = Query(default=2, ge=2, le=12, description="Number of consecutive periods in each metrics history"),
+    layout: str = Query(default="rows", pattern="^(rows|columnar)$", description="Trend/severity shape: rows (list of points) or columnar (parallel arrays)"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get complete dashboards for several windows from a single BigQuery scan
+
+    One query aggregates activity per day over the longest window and every
+    window is folded from it, so prefetching 7/30/90/365-day views costs one
+    job instead of one set per window. Subsequent /dashboard requests for
+    these windows are served from the seeded cache.
+
+    Args:
+        windows: Comma-separated `days` values (default: 7,30,90,365)
+        periods: Number of consecutive periods in each metrics history (default: 2)
+        layout: Shape of trend_data and severity_data (default: rows)
+        if_none_match: ETag of the snapshot the client already holds
 
     Returns:
-        Complete executive dashboard metrics and visualizations
+        Object mapping each window (as a string) to its dashboard
+    """
+    parsed = _parse_windows(windows)
+    return await _serve_snapshot(
+        ('batch', parsed, periods, layout),
+        lambda timing, deadline: _build_batch_snapshot(parsed, periods, timing, deadline, layout),
+        if_none_match,
+        cost=_request_cost(parsed[-1], periods)
+    )
+
+@router.get("/metrics", response_model=MetricsComparison)
+async def get_executive_metrics(
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    periods: Optional[int] = Query(default=2, ge=2, le=12, description="Number of consecutive periods in the metrics history"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Get the KPI section: current and previous period metrics plus history"""
+    return await _serve_sections(days, periods, ('metrics',), if_none_match, section='metrics')
+
+@router.get("/unique-counts", response_model=UniqueCounts)
+async def get_executive_unique_counts(
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days in each period"),
+    periods: Optional[int] = Query(default=2, ge=1, le=12, description="Number of consecutive periods"),
+    mode: str = Query(default="approximate", pattern="^(approximate|exact)$", description="approximate (HyperLogLog) or exact (COUNT DISTINCT, for audits)"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get unique source IPs and affected assets per period
+
+    Approximate counts merge per-day HyperLogLog sketches (relative standard
+    error about 1.6%); `mode=exact` counts raw rows for audits. Counts are
+    never replaced by mock data.
+
+    Args:
+        days: Number of days in each period (default: 30)
+        periods: Number of consecutive periods (default: 2)
+        mode: approximate or exact (default: approximate)
+        if_none_match: ETag of the snapshot the client already holds
     """
+    if not settings.distinct_counts_enabled:
+        raise HTTPException(status_code=404, detail="Distinct counts are disabled (DISTINCT_COUNTS_ENABLED=false)")
+
+    return await _serve_snapshot(
+        ('unique_counts', days, periods, mode),
+        lambda timing, deadline: _build_unique_counts_snapshot(days, periods, mode, timing),
+        if_none_match,
+        cost=_request_cost(days, periods)
+    )
+
+@router.get("/trend", response_model=Union[List[TrendDataPoint], TrendDataColumns])
+async def get_executive_trend(
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    granularity: str = Query(default="day", pattern="^(minute|hour|day)$", description="Bucket width: minute, hour or day"),
+    layout: str = Query(default="rows", pattern="^(rows|columnar)$", description="Trend/severity shape: rows (list of points) or columnar (parallel arrays)"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Get the incident trend section, per minute, hour or day, downsampled to TREND_MAX_POINTS"""
+    return await _serve_sections(
+        days, None, ('trend_data',), if_none_match, section='trend_data', granularity=granularity, layout=layout
+    )
+
+@router.get("/severity", response_model=Union[List[SeverityData], SeverityDataColumns])
+async def get_executive_severity(
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    layout: str = Query(default="rows", pattern="^(rows|columnar)$", description="Trend/severity shape: rows (list of points) or columnar (parallel arrays)"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Get the severity distribution section"""
+    return await _serve_sections(days, None, ('severity_data',), if_none_match, section='severity_data', layout=layout)
+
+@router.get("/risks", response_model=List[RiskItem])
+async def get_executive_risks(if_none_match: Optional[str] = Header(default=None)):
+    """Get the risk assessment section"""
+    return await _serve_sections(None, None, ('risks',), if_none_match, section='risks')
+
+@router.get("/compliance", response_model=List[ComplianceFramework])
+async def get_executive_compliance(if_none_match: Optional[str] = Header(default=None)):
+    """Get the compliance scorecard section"""
+    return await _serve_sections(None, None, ('compliance',), if_none_match, section='compliance')
+
+def _parse_windows(windows: str) -> Tuple[int, ...]:
+    """Parse a `windows=` value into sorted, distinct `days` values"""
     try:
-        # Fetch data from BigQuery
-        incident_data = bigquery_service.get_incident_metrics(days=days)
-        agent_data = bigquery_service.get_agent_metrics()
-        trend_data_raw = bigquery_service.get_trend_data(days=days)
-        severity_data_raw = bigquery_service.get_severity_distribution(days=days)
-
-        # Transform data
-        metrics = data_transformer.transform_executive_metrics(
-            incident_data=incident_data,
-            agent_data=agent_data
+        parsed = sorted({int(window) for window in windows.split(',') if window.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid windows: {windows}")
+
+    if not parsed or len(parsed) > MAX_BATCH_WINDOWS or parsed[0] < 1 or parsed[-1] > 365:
+        raise HTTPException(
+            status_code=400,
+            detail=f"windows must list 1-{MAX_BATCH_WINDOWS} values between 1 and 365"
+        )
+
+    return tuple(parsed)
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a `fields=` value into response sections, in response order"""
+    if not fields:
+        return DASHBOARD_SECTIONS
+
+    requested = {
+        SECTION_ALIASES.get(field.strip(), field.strip())
+        for field in fields.split(',')
+        if field.strip()
+    }
+    unknown = requested - set(DASHBOARD_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Valid fields: {', '.join(DASHBOARD_SECTIONS)}"
         )
-        trend_data = data_transformer.transform_trend_data(trend_data_raw)
-        severity_data = data_transformer.transform_severity_data(severity_data_raw)
-        risks = data_transformer.get_static_risks()
-        compliance = data_transformer.get_static_compliance()
-
-        # Build response
-        dashboard_response = data_transformer.build_dashboard_response(
-            metrics=metrics,
-            trend_data=trend_data,
-            severity_data=severity_data,
-            risks=risks,
-            compliance=compliance
+
+    return tuple(section for section in DASHBOARD_SECTIONS if section in requested)
+
+def _request_cost(days: int, periods: Optional[int]) -> int:
+    """Admission cost of a build: the days it scans, in ADMISSION_COST_UNIT_DAYS units"""
+    return math.ceil(days * (periods or 1) / settings.admission_cost_unit_days)
+
+async def _serve_sections(
+    days: Optional[int],
+    periods: Optional[int],
+    sections: Tuple[str, ...],
+    if_none_match: Optional[str],
+    section: Optional[str] = None,
+    granularity: str = 'day',
+    layout: str = 'rows'
+) -> Response:
+    """
+    Serve dashboard sections from a snapshot, honouring If-None-Match
+
+    Args:
+        days: Number of days to look back (None for sections that ignore it)
+        periods: Number of metric periods (None for sections that ignore it)
+        sections: Response sections to build
+        if_none_match: ETag of the snapshot the client already holds
+        section: Return only this section's value instead of an object of sections
+        granularity: Trend bucket width, if the trend section is included
+        layout: 'rows' or 'columnar' shape for the time-series sections
+    """
+    if 'trend_data' not in sections:
+        granularity = 'day'
+    if not any(name in COLUMNAR_SECTIONS for name in sections):
+        layout = 'rows'
+    elif granularity == 'minute' and days > MINUTE_TREND_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Minute granularity is limited to {MINUTE_TREND_MAX_DAYS} days; use hour for longer windows"
         )
 
-        return dashboard_response
+    key = (days, periods, sections, section, granularity, layout)
+    return await _serve_snapshot(
+        key,
+        lambda timing, deadline: _build_dashboard_snapshot(key, timing, deadline),
+        if_none_match,
+        # Risks and compliance are static and need no warehouse work
+        cost=_request_cost(days, periods) if datasets_for_sections(sections) else 0
+    )
+
+async def _serve_snapshot(
+    key: Tuple,
+    build: Callable[[ServerTiming, Deadline], Awaitable[DashboardSnapshot]],
+    if_none_match: Optional[str],
+    cost: int = 0
+) -> Response:
+    """
+    Serve a cached snapshot (building it on a miss) with ETag, 304 and Server-Timing
 
+    Warehouse work is bounded by REQUEST_DEADLINE_SECONDS. Snapshots built
+    from last good results during a warehouse outage, or with sections that
+    missed the deadline, carry a `Warning: 110` header and are rebuilt by the
+    next request once the warehouse is available.
+
+    Builds (but not cache hits) go through admission control; a request that
+    cannot be admitted gets 429 with Retry-After. Concurrent requests for the
+    same key share one build, admitted once at its cost.
+
+    Args:
+        key: Snapshot cache key
+        build: Coroutine function building the snapshot, given the request's
+            timing recorder and deadline
+        if_none_match: ETag of the snapshot the client already holds
+        cost: Admission cost of a build (0 skips admission control)
+    """
+    timing = ServerTiming()
+    deadline = Deadline(settings.request_deadline_seconds)
+
+    built = []
+
+    def build_now() -> Awaitable[DashboardSnapshot]:
+        built.append(True)
+        # Followers wait on the first request's build, timing and deadline included
+        return snapshot_builds.do(key, lambda: _admitted(build, cost, timing, deadline))
+
+    try:
+        if dashboard_snapshots is not None:
+            with timing.measure('snapshot', 'Dashboard snapshot lookup'):
+                snapshot = await dashboard_snapshots.get_or_load(key, build_now)
+                # A stale snapshot from an earlier request is retried; one just built is served as is
+                if snapshot.stale and not built and bigquery_service.warehouse_available:
+                    dashboard_snapshots.invalidate(key)
+                    snapshot = await dashboard_snapshots.get_or_load(key, build_now)
+        else:
+            snapshot = await build_now()
+
+        headers = {
+            'ETag': snapshot.etag,
+            'Cache-Control': 'private, no-cache'
+        }
+        if settings.server_timing_enabled:
+            headers['Server-Timing'] = timing.header_value()
+            # Lets the frontend read the breakdown via the Resource Timing API too
+            headers['Timing-Allow-Origin'] = ", ".join(settings.cors_origins)
+        if snapshot.stale:
+            headers['Warning'] = STALE_WARNING
+
+        if etag_matches(if_none_match, snapshot.etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many expensive dashboard requests in flight ({e.reason})",
+            headers={'Retry-After': str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching executive dashboard data: {str(e)}"
         )
 
+async def _admitted(
+    build: Callable[[ServerTiming, Deadline], Awaitable[DashboardSnapshot]],
+    cost: int,
+    timing: ServerTiming,
+    deadline: Deadline
+) -> DashboardSnapshot:
+    """Run a snapshot build once admission control lets `cost` units through"""
+    if admission is None or not cost:
+        return await build(timing, deadline)
+
+    started = time.perf_counter()
+    async with admission.admit(cost, timeout=deadline.remaining()):
+        timing.add('admission', (time.perf_counter() - started) * 1000, 'Admission queue')
+        return await build(timing, deadline)
+
+async def _build_dashboard_snapshot(key: Tuple, timing: ServerTiming, deadline: Deadline) -> DashboardSnapshot:
+    """
+    Fetch, transform and serialize the sections identified by a snapshot key
+
+    Only the BigQuery datasets the sections need are fetched. When they hash
+    to the same ETag as the previous snapshot, that snapshot's body is reused
+    and transformation is skipped.
+    """
+    days, periods, sections, section, granularity, layout = key
+
+    # Fetch data from BigQuery (all queries run concurrently)
+    raw_data = await bigquery_service.get_dashboard_data(
+        days=days,
+        periods=periods,
+        timing=timing,
+        datasets=datasets_for_sections(sections),
+        deadline=deadline,
+        granularity=granularity
+    )
+    stale = not bigquery_service.warehouse_available or bool(deadline.missed)
+
+    etag = compute_etag(
+        {**raw_data, **data_transformer.static_sections(sections)},
+        variant=[sections, section, layout]
+    )
+    previous = dashboard_snapshots.get(key) if dashboard_snapshots is not None else None
+    if previous is not None and previous.etag == etag:
+        return previous if previous.stale == stale else DashboardSnapshot(etag, previous.body, stale)
+
+    return DashboardSnapshot(etag, _serialize(raw_data, sections, section, timing, layout), stale)
+
+async def _build_batch_snapshot(
+    windows: Tuple[int, ...],
+    periods: int,
+    timing: ServerTiming,
+    deadline: Deadline,
+    layout: str = 'rows'
+) -> DashboardSnapshot:
+    """Fetch every window from one scan, then transform and serialize them together"""
+    batch = await bigquery_service.get_dashboard_batch(list(windows), periods=periods, timing=timing, deadline=deadline)
+    stale = not bigquery_service.warehouse_available or bool(deadline.missed)
+
+    key = ('batch', windows, periods, layout)
+    etag = compute_etag({str(days): raw_data for days, raw_data in batch.items()}, variant=layout)
+    previous = dashboard_snapshots.get(key) if dashboard_snapshots is not None else None
+    if previous is not None and previous.etag == etag:
+        return previous if previous.stale == stale else DashboardSnapshot(etag, previous.body, stale)
+
+    # Each window is encoded on its own and spliced into one JSON object
+    parts = [
+        b'"' + str(days).encode("utf-8") + b'":' + _serialize(batch[days], DASHBOARD_SECTIONS, None, timing, layout)
+        for days in windows
+    ]
+    return DashboardSnapshot(etag, b"{" + b",".join(parts) + b"}", stale)
+
+async def _build_unique_counts_snapshot(days: int, periods: int, mode: str, timing: ServerTiming) -> DashboardSnapshot:
+    """
+    Fetch and serialize unique counts
+
+    The request deadline is not applied: an exact audit count over a long
+    window may take longer, and has no cached or mock stand-in.
+    """
+    with timing.measure('bq-unique', 'Unique counts'):
+        counts = await bigquery_service.get_unique_counts_async(days, periods, exact=mode == 'exact')
+    with timing.measure('serialize', 'Response serialization'):
+        body = dumps_json(counts)
+    return DashboardSnapshot(compute_etag(counts), body, not bigquery_service.warehouse_available)
+
+def _serialize(
+    raw_data: Dict,
+    sections: Tuple[str, ...],
+    section: Optional[str],
+    timing: ServerTiming,
+    layout: str = 'rows'
+) -> bytes:
+    """Transform raw data into the requested sections and encode them as JSON"""
+    if settings.fast_serialization_enabled:
+        # Trusted fast path: plain data straight from our own query results
+        with timing.measure('transform', 'Dashboard payload'):
+            payload = data_transformer.build_dashboard_payload(raw_data, sections)
+            if layout == 'columnar':
+                payload = data_transformer.to_columnar(payload)
+        with timing.measure('serialize', 'Response serialization'):
+            return dumps_json(payload[section] if section else payload)
+
+    models = transform_sections(raw_data, sections, timing)
+    if layout == 'columnar':
+        with timing.measure('transform-columnar', 'Columnar sections'):
+            models = data_transformer.to_columnar({
+                name: [point.model_dump(mode='json') for point in value] if name in COLUMNAR_SECTIONS else value
+                for name, value in models.items()
+            })
+
+    # Serialize here rather than in FastAPI so the cost shows up in Server-Timing
+    with timing.measure('serialize', 'Response serialization'):
+        return to_json(models[section] if section else {**models, 'generated_at': datetime.now()})
+
+def transform_sections(
+    raw_data: Dict,
+    sections: Tuple[str, ...] = DASHBOARD_SECTIONS,
+    timing: Optional[ServerTiming] = None
+) -> Dict[str, Any]:
+    """
+    Transform raw BigQuery data into validated models for the given sections
+
+    Args:
+        raw_data: Result of bigquery_service.get_dashboard_data
+        sections: Response sections to build (default: all)
+        timing: Optional recorder for a per-step Server-Timing breakdown
+
+    Returns:
+        Dictionary of section name to model (or list of models)
+    """
+    timing = timing or ServerTiming()
+    models = {}
+
+    # Transform data
+    if 'metrics' in sections:
+        with timing.measure('transform-metrics', 'Executive metrics'):
+            models['metrics'] = data_transformer.transform_executive_metrics(
+                incident_data=raw_data['incident_data'],
+                agent_data=raw_data['agent_data']
+            )
+    if 'trend_data' in sections:
+        with timing.measure('transform-trend', 'Trend data'):
+            models['trend_data'] = data_transformer.transform_trend_data(raw_data['trend_data'])
+    if 'severity_data' in sections:
+        with timing.measure('transform-severity', 'Severity data'):
+            models['severity_data'] = data_transformer.transform_severity_data(raw_data['severity_data'])
+    if 'risks' in sections or 'compliance' in sections:
+        with timing.measure('transform-static', 'Risks and compliance'):
+            if 'risks' in sections:
+                models['risks'] = data_transformer.get_static_risks()
+            if 'compliance' in sections:
+                models['compliance'] = data_transformer.get_static_compliance()
+
+    return models
+
+def transform_dashboard(raw_data: Dict, timing: Optional[ServerTiming] = None) -> ExecutiveDashboardResponse:
+    """
+    Transform raw BigQuery data into the dashboard response model
+
+    Args:
+        raw_data: Result of bigquery_service.get_dashboard_data
+        timing: Optional recorder for a per-step Server-Timing breakdown
+
+    Returns:
+        Complete ExecutiveDashboardResponse
+    """
+    timing = timing or ServerTiming()
+    models = transform_sections(raw_data, DASHBOARD_SECTIONS, timing)
+
+    # Build response
+    with timing.measure('transform-response', 'Dashboard response'):
+        return data_transformer.build_dashboard_response(**models)
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Result cache hit/miss/refresh counters"""
+    stats = bigquery_service.get_cache_stats()
+    stats['dashboard_snapshots'] = dashboard_snapshots.stats() if dashboard_snapshots is not None else {'enabled': False}
+    stats['snapshot_builds'] = snapshot_builds.stats()
+    stats['admission'] = admission.stats() if admission is not None else {'enabled': False}
+    return stats
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,73 @@
+"""
+Server-Sent Events stream of live Executive Dashboard updates
+"""
+import asyncio
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+from ..config.settings import settings
+from ..services.bigquery_service import bigquery_service
+from ..services.data_transformer import data_transformer
+from ..services.live_updates import DashboardBroadcaster
+from ..services.metrics import metrics_registry
+from .executive import transform_dashboard
+
+router = APIRouter(prefix="/api/executive", tags=["Executive Dashboard"])
+
+async def _build_dashboard(days: int, periods: int) -> Dict:
+    """Fetch and transform the dashboard for one window into plain JSON-ready data"""
+    raw_data = await bigquery_service.get_dashboard_data(days=days, periods=periods)
+    if settings.fast_serialization_enabled:
+        return data_transformer.build_dashboard_payload(raw_data)
+    return transform_dashboard(raw_data).model_dump(mode='json')
+
+broadcaster = DashboardBroadcaster(
+    _build_dashboard,
+    refresh_seconds=settings.live_refresh_seconds,
+    max_pending=settings.live_max_pending_events
+)
+metrics_registry.register_collector(broadcaster.collect_metrics)
+
+@router.get("/stream")
+async def stream_executive_dashboard(
+    days: Optional[int] = Query(default=30, ge=1, le=365, description="Number of days to analyze"),
+    periods: Optional[int] = Query(default=2, ge=2, le=12, description="Number of consecutive periods in the metrics history")
+):
+    """
+    Stream live dashboard updates as Server-Sent Events
+
+    The first event is a full `snapshot` (same shape as /dashboard). After
+    that only changed sections are pushed: `metrics`, `severity_data` and
+    `trend_data` (window bounds plus new or changed points). All viewers of
+    the same window share one server-side refresh loop.
+
+    Args:
+        days: Number of days to look back (default: 30)
+        periods: Number of consecutive periods in the metrics history (default: 2)
+    """
+    channel, subscriber = broadcaster.subscribe(days, periods)
+
+    async def events():
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield f"retry: {int(settings.live_refresh_seconds * 1000)}\n\n".encode("utf-8")
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=settings.live_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps idle connections open through proxies
+                    yield b": keep-alive\n\n"
+        finally:
+            broadcaster.unsubscribe(channel, subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
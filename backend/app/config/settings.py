@@ -11,10 +11,15 @@ load_dotenv()
 class Settings(BaseSettings):
     """Application settings"""
 
+    # Warehouse backend: "bigquery" or "local" (embedded DuckDB file)
+    warehouse_backend: str = os.getenv("WAREHOUSE_BACKEND", "bigquery")
+    local_warehouse_path: str = os.getenv("LOCAL_WAREHOUSE_PATH", "local_warehouse.duckdb")
+
     # Google Cloud Platform
     gcp_project_id: str = os.getenv("GCP_PROJECT_ID", "chronicle-dev-2be9")
     bigquery_dataset: str = os.getenv("BIGQUERY_DATASET", "gatra_database")
     google_credentials_path: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
+    bigquery_storage_read_enabled: bool = os.getenv("BIGQUERY_STORAGE_READ_ENABLED", "false").lower() == "true"
 
     # API Configuration
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
@@ -30,10 +35,72 @@ class Settings(BaseSettings):
         "http://127.0.0.1:3000"
     ]
 
+    # Per-request timing breakdown in the Server-Timing response header
+    server_timing_enabled: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+
+    # Build dashboard responses as plain data and encode with orjson (skips pydantic validation)
+    fast_serialization_enabled: bool = os.getenv("FAST_SERIALIZATION_ENABLED", "true").lower() == "true"
+
+    # Most points in a trend series; longer series are downsampled with LTTB
+    trend_max_points: int = int(os.getenv("TREND_MAX_POINTS", "500"))
+
+    # Result cache
+    cache_enabled: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    cache_stale_while_revalidate: bool = os.getenv("CACHE_STALE_WHILE_REVALIDATE", "true").lower() == "true"
+    cache_max_stale_seconds: int = int(os.getenv("CACHE_MAX_STALE_SECONDS", "3600"))
+
+    # Cross-worker shared cache (SQLite file read by every worker process on the host)
+    shared_cache_enabled: bool = os.getenv("SHARED_CACHE_ENABLED", "false").lower() == "true"
+    shared_cache_path: str = os.getenv("SHARED_CACHE_PATH", "shared_cache.sqlite3")
+    shared_cache_max_mb: int = int(os.getenv("SHARED_CACHE_MAX_MB", "64"))
+    shared_cache_lease_seconds: float = float(os.getenv("SHARED_CACHE_LEASE_SECONDS", "30"))
+
+    # Deadlines: total warehouse budget per dashboard request, and the longest any single query may run
+    request_deadline_seconds: float = float(os.getenv("REQUEST_DEADLINE_SECONDS", "8"))
+    query_timeout_seconds: float = float(os.getenv("QUERY_TIMEOUT_SECONDS", "30"))
+
+    # Admission control: concurrent cost of dashboard builds (cost = days scanned / unit) and warehouse jobs
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    admission_max_cost: int = int(os.getenv("ADMISSION_MAX_COST", "32"))
+    admission_max_queued_cost: int = int(os.getenv("ADMISSION_MAX_QUEUED_COST", "64"))
+    admission_cost_unit_days: int = int(os.getenv("ADMISSION_COST_UNIT_DAYS", "30"))
+    max_concurrent_queries: int = int(os.getenv("MAX_CONCURRENT_QUERIES", "16"))
+
+    # Warehouse circuit breaker: fail fast and serve last good results during an outage
+    circuit_breaker_enabled: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    circuit_reset_seconds: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+    # Live updates (Server-Sent Events)
+    live_refresh_seconds: float = float(os.getenv("LIVE_REFRESH_SECONDS", "30"))
+    live_heartbeat_seconds: float = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+    live_max_pending_events: int = int(os.getenv("LIVE_MAX_PENDING_EVENTS", "16"))
+
+    # Startup warm-up: prefetch these windows before /ready reports ready
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    warmup_windows: str = os.getenv("WARMUP_WINDOWS", "7,30,90,365")
+    warmup_timeout_seconds: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "120"))
+    warmup_retry_seconds: float = float(os.getenv("WARMUP_RETRY_SECONDS", "10"))
+
+    # Daily rollup
+    rollup_enabled: bool = os.getenv("ROLLUP_ENABLED", "false").lower() == "true"
+    rollup_table: str = os.getenv("ROLLUP_TABLE", "activity_daily_rollup")
+    rollup_lookback_days: int = int(os.getenv("ROLLUP_LOOKBACK_DAYS", "3"))
+
+    # Approximate distinct counts (needs activity_logs.source_ip and asset_name)
+    distinct_counts_enabled: bool = os.getenv("DISTINCT_COUNTS_ENABLED", "false").lower() == "true"
+
     # Environment
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = environment == "development"
 
+    @property
+    def warmup_window_days(self) -> List[int]:
+        """WARMUP_WINDOWS parsed into `days` values"""
+        return [int(window) for window in self.warmup_windows.split(",") if window.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,19 +1,43 @@
 """
 FastAPI main application
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
 
 from .config.settings import settings
-from .api import executive
+from .api import executive, live
+from .services.bigquery_service import bigquery_service
+from .services.metrics import metrics_registry
+from .services.warmup import Warmup
+
+warmup = Warmup(
+    bigquery_service,
+    windows=settings.warmup_window_days if settings.warmup_enabled else [],
+    timeout_seconds=settings.warmup_timeout_seconds,
+    retry_seconds=settings.warmup_retry_seconds
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the warehouse client and warm caches in the background; clean up on shutdown"""
+    warmup.start()
+    yield
+    await warmup.stop()
+    live.broadcaster.close()
+    # Waits (up to QUERY_TIMEOUT_SECONDS) for queries still running on worker threads
+    await asyncio.to_thread(bigquery_service.close)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
     description="REST API for SOC Executive Dashboard - Serves real-time security metrics from BigQuery",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -23,10 +47,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "Warning", "Retry-After"],
 )
 
 # Include routers
 app.include_router(executive.router)
+app.include_router(live.router)
 
 @app.get("/")
 async def root():
@@ -39,7 +65,10 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "executive_dashboard": "/api/executive/dashboard",
-            "health": "/api/executive/health"
+            "executive_stream": "/api/executive/stream",
+            "health": "/api/executive/health",
+            "ready": "/ready",
+            "metrics": "/metrics"
         }
     }
 
@@ -51,6 +80,19 @@ async def health():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the warehouse client exists and the startup warm-up is done"""
+    return JSONResponse(warmup.readiness(), status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
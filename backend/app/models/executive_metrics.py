@@ -1,7 +1,7 @@
 """
 Pydantic models for Executive Dashboard data
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -17,23 +17,76 @@ class ExecutiveMetrics(BaseModel):
     mttr: float  # Mean Time To Respond (minutes)
     mttd: float  # Mean Time To Detect (minutes)
     mttr_resolve: float  # Mean Time To Resolve (minutes)
+    response_time_p50: Optional[float] = None  # Median response time (minutes)
+    response_time_p90: Optional[float] = None  # 90th percentile response time (minutes)
+    response_time_p99: Optional[float] = None  # 99th percentile response time (minutes)
+    unique_source_ips: Optional[int] = None  # Distinct attacking IPs (HyperLogLog estimate, ±1.6% std error)
+    unique_assets: Optional[int] = None  # Distinct affected assets (HyperLogLog estimate, ±1.6% std error)
+
+class PeriodMetrics(BaseModel):
+    """Incident and agent KPIs for one period of the metrics history"""
+    period_index: int  # 0 = current period, 1 = previous, ...
+    start_date: str
+    end_date: str
+    total_incidents: int
+    critical_incidents: int
+    avg_response_time: float
+    resolved_rate: float
+    false_positive_rate: float
+    response_time_p50: Optional[float] = None
+    response_time_p90: Optional[float] = None
+    response_time_p99: Optional[float] = None
+    unique_source_ips: Optional[int] = None
+    unique_assets: Optional[int] = None
+    security_score: Optional[int] = None
+    mttr: Optional[float] = None
+    mttd: Optional[float] = None
+    mttr_resolve: Optional[float] = None
 
 class MetricsComparison(BaseModel):
     """Current vs previous period metrics"""
     current: ExecutiveMetrics
     previous: ExecutiveMetrics
+    history: List[PeriodMetrics] = []  # Oldest period first
+
+class PeriodUniqueCounts(BaseModel):
+    """Distinct counts for one period"""
+    period_index: int  # 0 = current period, 1 = previous, ...
+    start_date: str
+    end_date: str
+    unique_source_ips: Optional[int] = None
+    unique_assets: Optional[int] = None
+
+class UniqueCounts(BaseModel):
+    """Distinct counts per period, estimated from sketches or exact"""
+    mode: str  # 'approximate' or 'exact'
+    relative_standard_error: float  # 0 when exact
+    periods: List[PeriodUniqueCounts]  # Oldest period first
 
 class TrendDataPoint(BaseModel):
     """Single data point for trend charts"""
-    date: str
+    date: str  # Chart label for the bucket, e.g. "Oct 16" or "Oct 16 14:00"
+    timestamp: Optional[str] = None  # ISO 8601 start of the bucket
     incidents: int
 
+class TrendDataColumns(BaseModel):
+    """Trend points as parallel arrays (layout=columnar)"""
+    date: List[str]
+    timestamp: List[Optional[str]]
+    incidents: List[int]
+
 class SeverityData(BaseModel):
     """Severity distribution data"""
     name: str
     value: int
     color: str
 
+class SeverityDataColumns(BaseModel):
+    """Severity distribution as parallel arrays (layout=columnar)"""
+    name: List[str]
+    value: List[int]
+    color: List[str]
+
 class RiskItem(BaseModel):
     """Security risk item"""
     risk: str
@@ -49,8 +102,17 @@ class ComplianceFramework(BaseModel):
 class ExecutiveDashboardResponse(BaseModel):
     """Complete executive dashboard data"""
     metrics: MetricsComparison
-    trend_data: List[TrendDataPoint]
-    severity_data: List[SeverityData]
+    trend_data: Union[List[TrendDataPoint], TrendDataColumns]
+    severity_data: Union[List[SeverityData], SeverityDataColumns]
     risks: List[RiskItem]
     compliance: List[ComplianceFramework]
     generated_at: datetime
+
+class ExecutiveDashboardSections(BaseModel):
+    """Executive dashboard sections selected with `fields=`"""
+    metrics: Optional[MetricsComparison] = None
+    trend_data: Optional[Union[List[TrendDataPoint], TrendDataColumns]] = None
+    severity_data: Optional[Union[List[SeverityData], SeverityDataColumns]] = None
+    risks: Optional[List[RiskItem]] = None
+    compliance: Optional[List[ComplianceFramework]] = None
+    generated_at: datetime
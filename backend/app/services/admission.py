@@ -0,0 +1,156 @@
+"""
+Cost-weighted admission control for expensive dashboard builds
+
+Each request declares a cost (longer windows scan more and cost more). Up to
+`max_cost` units run at once; further requests wait in a bounded queue, and
+once the queued cost would exceed `max_queued_cost` they are rejected so the
+endpoint can answer 429 with a Retry-After estimate. Waiters are admitted
+first-fit in arrival order: a cheap request that fits in the spare capacity
+goes ahead of an expensive one still waiting for room, so a burst of
+365-day requests cannot hold up the 7-day views behind it.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from .metrics import metrics_registry
+
+ADMISSION_WAIT = metrics_registry.histogram(
+    "dashboard_admission_wait_seconds", "Time dashboard builds waited for admission", ["outcome"]
+)
+ADMISSION_REJECTIONS = metrics_registry.counter(
+    "dashboard_admission_rejections_total", "Dashboard builds rejected by admission control", ["reason"]
+)
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; retry after `retry_after` seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request not admitted ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("cost", "future")
+
+    def __init__(self, cost: int, future: asyncio.Future):
+        self.cost = cost
+        self.future = future
+
+
+class AdmissionController:
+    """Weighted concurrency limit with a bounded, cost-accounted wait queue"""
+
+    def __init__(self, max_cost: int = 32, max_queued_cost: int = 64):
+        """
+        Args:
+            max_cost: Total cost of builds allowed to run at once
+            max_queued_cost: Total cost allowed to wait before new requests are rejected
+        """
+        self.max_cost = max_cost
+        self.max_queued_cost = max_queued_cost
+
+        self._in_use = 0
+        self._queued_cost = 0
+        self._waiters: Deque[_Waiter] = deque()
+        # Smoothed seconds a build holds its admission, for Retry-After estimates
+        self._hold_seconds = 1.0
+
+    @asynccontextmanager
+    async def admit(self, cost: int, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold `cost` units of capacity for the duration of the block
+
+        Args:
+            cost: Units this request needs (clamped to 1..max_cost)
+            timeout: Longest to wait in the queue (default: no limit)
+
+        Raises:
+            AdmissionRejected: The queue is full, or `timeout` passed first
+        """
+        cost = max(1, min(cost, self.max_cost))
+        started = time.monotonic()
+
+        if self._in_use + cost <= self.max_cost:
+            self._in_use += cost
+        else:
+            await self._wait(cost, timeout)
+        ADMISSION_WAIT.observe(time.monotonic() - started, outcome='admitted')
+
+        held = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * (time.monotonic() - held)
+            self._release(cost)
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until the current backlog has drained"""
+        backlog = (self._in_use + self._queued_cost) / self.max_cost
+        return max(1, math.ceil(self._hold_seconds * backlog))
+
+    def stats(self) -> Dict:
+        """Return capacity in use and the queue's size"""
+        return {
+            'in_use_cost': self._in_use,
+            'max_cost': self.max_cost,
+            'queued': len(self._waiters),
+            'queued_cost': self._queued_cost,
+            'max_queued_cost': self.max_queued_cost,
+        }
+
+    def collect_metrics(self):
+        """Report capacity in use and queued cost for /metrics"""
+        yield ("dashboard_admission_in_use_cost", "gauge", "Cost of dashboard builds running", [({}, self._in_use)])
+        yield ("dashboard_admission_queued_cost", "gauge", "Cost of dashboard builds waiting for admission", [({}, self._queued_cost)])
+
+    async def _wait(self, cost: int, timeout: Optional[float]) -> None:
+        """Queue for `cost` units, rejecting when the queue is full or the wait times out"""
+        if self._queued_cost + cost > self.max_queued_cost:
+            self._reject('queue_full', 0.0)
+
+        waiter = _Waiter(cost, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._queued_cost += cost
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the wait ended: hand the capacity back
+                self._release(cost)
+            else:
+                waiter.future.cancel()
+                self._dequeue(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject('timeout', time.monotonic() - started)
+
+    def _reject(self, reason: str, waited: float) -> None:
+        ADMISSION_WAIT.observe(waited, outcome='rejected')
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        raise AdmissionRejected(reason, self.retry_after())
+
+    def _release(self, cost: int) -> None:
+        """Return capacity and admit every waiter that now fits, oldest first"""
+        self._in_use -= cost
+
+        granted: List[_Waiter] = []
+        for waiter in self._waiters:
+            if self._in_use + waiter.cost <= self.max_cost:
+                self._in_use += waiter.cost
+                granted.append(waiter)
+
+        for waiter in granted:
+            self._dequeue(waiter)
+            waiter.future.set_result(None)
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        self._queued_cost -= waiter.cost
@@ -1,117 +1,1227 @@
 """
 BigQuery service for fetching security metrics data
 """
-from google.cloud import bigquery
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import pandas as pd
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 from ..config.settings import settings
+from .result_cache import ResultCache
+from .shared_cache import SharedResultCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .deadline import Deadline, bind_deadline, current_deadline
+from .single_flight import SingleFlight
+from .server_timing import ServerTiming
+from .rollup import (
+    DAILY_FOLD_COLUMNS,
+    DISTINCT_COUNTS,
+    as_date,
+    build_daily_source_sql,
+    build_merged_distinct_sql,
+    build_merged_sketch_sql,
+    build_raw_daily_aggregate_sql,
+    build_watermark_sql
+)
+from .quantile_sketch import QuantileSketch
+from .distinct_sketch import STANDARD_ERROR, estimate_count
+from .warehouse import Warehouse, create_warehouse
+from .metrics import metrics_registry, BYTES_BUCKETS, ROW_BUCKETS
+from .downsampling import downsample
+
+# Datasets returned by get_dashboard_data
+DASHBOARD_DATASETS = ('incident_data', 'agent_data', 'trend_data', 'severity_data')
+
+# Trend bucket widths by granularity, with the label format of each bucket
+TREND_GRANULARITIES = {
+    'minute': (timedelta(minutes=1), '%b %d %H:%M'),
+    'hour': (timedelta(hours=1), '%b %d %H:00'),
+    'day': (timedelta(days=1), '%b %d'),
+}
+
+# Response-time percentiles reported with the incident metrics
+RESPONSE_TIME_PERCENTILES = {
+    'response_time_p50': 0.50,
+    'response_time_p90': 0.90,
+    'response_time_p99': 0.99,
+}
+
+# Agent metrics averaged per period, with the agent_metrics column each averages
+AGENT_METRIC_COLUMNS = {
+    'mttd': 'detection_time_minutes',
+    'mttr': 'response_time_minutes',
+    'mttr_resolve': 'resolution_time_minutes',
+    'security_score': 'security_score',
+}
+
+# Merged distinct-count statistics of a period without values
+NO_UNIQUE_VALUES = {f'{metric}_{stat}': 0 for metric in DISTINCT_COUNTS for stat in ('registers', 'harmonic')}
+
+# Interval at which a worker checks for a result another worker is loading
+SHARED_CACHE_POLL_SECONDS = 0.1
+
+# Per-query instrumentation, labelled by logical query name
+QUERY_DURATION = metrics_registry.histogram(
+    "dashboard_query_duration_seconds", "Wall time of warehouse queries", ["query"]
+)
+QUERY_QUEUE_TIME = metrics_registry.histogram(
+    "dashboard_query_queue_seconds", "Time warehouse jobs spent queued before starting", ["query"]
+)
+QUERY_BYTES = metrics_registry.histogram(
+    "dashboard_query_bytes_processed", "Bytes processed by warehouse queries", ["query"], BYTES_BUCKETS
+)
+QUERY_ROWS = metrics_registry.histogram(
+    "dashboard_query_rows", "Rows returned by warehouse queries", ["query"], ROW_BUCKETS
+)
+QUERY_TOTAL = metrics_registry.counter(
+    "dashboard_queries_total", "Warehouse queries by outcome and warehouse cache-hit status", ["query", "status", "cache_hit"]
+)
+QUERY_SLOT_WAIT = metrics_registry.histogram(
+    "dashboard_query_slot_wait_seconds", "Time queries waited for one of MAX_CONCURRENT_QUERIES slots", ["query"]
+)
+STALE_RESULTS = metrics_registry.counter(
+    "dashboard_stale_results_total", "Last good cached results served during an outage or after a missed deadline", ["method"]
+)
 
 class BigQueryService:
     """Service for interacting with BigQuery"""
 
-    def __init__(self):
-        """Initialize BigQuery client"""
-        self.project_id = settings.gcp_project_id
-        self.dataset_id = settings.bigquery_dataset
-        self.client = bigquery.Client(project=self.project_id)
+    def __init__(self, warehouse: Optional[Warehouse] = None):
+        """
+        Initialize the service
+
+        Args:
+            warehouse: Warehouse to run queries against (default: the one
+                selected by the WAREHOUSE_BACKEND setting)
+        """
+        # Created on first use (or by start()), so importing this module never
+        # touches credentials or the network
+        self._warehouse = warehouse
+        self._warehouse_lock = threading.Lock()
+        # Warehouse calls running on worker threads; close() waits for them
+        self._active_queries = 0
+        self._queries_done = threading.Condition()
+        self.cache = ResultCache(
+            ttl_seconds=settings.cache_ttl_seconds,
+            max_entries=settings.cache_max_entries,
+            stale_while_revalidate=settings.cache_stale_while_revalidate,
+            max_stale_seconds=settings.cache_max_stale_seconds
+        ) if settings.cache_enabled else None
+        self.shared_cache = self._create_shared_cache() if settings.cache_enabled else None
+        self.single_flight = SingleFlight()
+        # Caps warehouse jobs in flight (and the worker threads waiting on them)
+        self.query_slots = asyncio.Semaphore(settings.max_concurrent_queries)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_seconds=settings.circuit_reset_seconds
+        ) if settings.circuit_breaker_enabled else None
+        # First date not covered by the daily rollup; None routes every query to raw rows
+        self.rollup_watermark = None
 
-    def _execute_query(self, query: str) -> pd.DataFrame:
-        """Execute a BigQuery query and return results as DataFrame"""
+    @property
+    def warehouse(self) -> Warehouse:
+        """Warehouse queries run against, created on first access"""
+        if self._warehouse is None:
+            with self._warehouse_lock:
+                if self._warehouse is None:
+                    self._warehouse = create_warehouse()
+        return self._warehouse
+
+    @warehouse.setter
+    def warehouse(self, warehouse: Warehouse) -> None:
+        self._warehouse = warehouse
+
+    @property
+    def project_id(self) -> str:
+        return self.warehouse.project_id
+
+    @property
+    def dataset_id(self) -> str:
+        return self.warehouse.dataset_id
+
+    async def start(self) -> None:
+        """Create the warehouse client off the event loop (credential discovery can block)"""
+        await asyncio.to_thread(lambda: self.warehouse)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Close the warehouse client if one was created
+
+        Queries still running on worker threads (e.g. coalesced loads whose
+        requests have gone) are given up to `timeout` seconds to finish
+        first, so they are not cut off mid-read and counted as failures.
+        Blocks, so call it off the event loop.
+
+        Args:
+            timeout: Seconds to wait for running queries (default: QUERY_TIMEOUT_SECONDS)
+        """
+        if timeout is None:
+            timeout = settings.query_timeout_seconds
+        with self._queries_done:
+            if not self._queries_done.wait_for(lambda: self._active_queries == 0, timeout):
+                print(f"Closing the warehouse with {self._active_queries} queries still running")
+            if self._warehouse is not None:
+                self._warehouse.close()
+                self._warehouse = None
+
+    def _execute_query(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        query_name: str = 'adhoc'
+    ) -> Any:
+        """
+        Execute a BigQuery query and return its results
+
+        Wall time, queue time, bytes processed, warehouse cache-hit status and
+        row count are recorded under `query_name` for the /metrics endpoint.
+        While the circuit breaker is open the query is not run and
+        CircuitOpenError is raised immediately.
+
+        The query's timeout is QUERY_TIMEOUT_SECONDS whatever request started
+        it: request deadlines are applied by the callers waiting for results
+        (see _fetch_within), so a coalesced load outlives the request that
+        started it and still fills the cache.
+
+        Args:
+            query: SQL to run
+            result_format: 'dataframe' (pandas DataFrame), 'rows' (list of dicts),
+                'scalar' (first row as a dict, empty if no rows) or 'arrow'
+                (list of pyarrow RecordBatches, fetched in full)
+            query_name: Logical query name used to label metrics
+
+        Returns:
+            Query results in the requested format
+        """
+        if self.breaker is not None:
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                QUERY_TOTAL.inc(query=query_name, status='rejected', cache_hit='false')
+                raise
+
+        job_stats: Dict = {}
+        started = time.perf_counter()
+
+        with self._queries_done:
+            self._active_queries += 1
         try:
-            query_job = self.client.query(query)
-            results = query_job.result()
-            return results.to_dataframe()
+            results = self.warehouse.execute(
+                query, result_format, job_stats=job_stats, timeout=settings.query_timeout_seconds
+            )
         except Exception as e:
+            QUERY_DURATION.observe(time.perf_counter() - started, query=query_name)
+            QUERY_TOTAL.inc(query=query_name, status='error', cache_hit='false')
+            if self.breaker is not None:
+                self.breaker.record_failure()
             print(f"Error executing query: {e}")
             raise
+        finally:
+            with self._queries_done:
+                self._active_queries -= 1
+                self._queries_done.notify_all()
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        QUERY_DURATION.observe(time.perf_counter() - started, query=query_name)
+        QUERY_ROWS.observe(self._count_rows(results, result_format), query=query_name)
+        if job_stats.get('queue_seconds') is not None:
+            QUERY_QUEUE_TIME.observe(job_stats['queue_seconds'], query=query_name)
+        if job_stats.get('bytes_processed') is not None:
+            QUERY_BYTES.observe(job_stats['bytes_processed'], query=query_name)
+        QUERY_TOTAL.inc(
+            query=query_name,
+            status='ok',
+            cache_hit='true' if job_stats.get('cache_hit') else 'false'
+        )
+
+        return results
+
+    @staticmethod
+    def _count_rows(results: Any, result_format: str) -> int:
+        """Return the number of rows in query results of the given format"""
+        if result_format == 'scalar':
+            return 1 if results else 0
+        if result_format == 'arrow':
+            return sum(batch.num_rows for batch in results)
+        return len(results)
+
+    async def _execute_query_async(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        query_name: str = 'adhoc'
+    ) -> Any:
+        """
+        Execute a BigQuery query without blocking the event loop
 
-    def get_incident_metrics(self, days: int = 30) -> Dict:
+        The job is submitted and awaited on a worker thread, so several
+        queries awaited together run as concurrent BigQuery jobs, up to
+        MAX_CONCURRENT_QUERIES at a time.
         """
-        Get incident metrics for current and previous periods
+        started = time.perf_counter()
+        async with self.query_slots:
+            QUERY_SLOT_WAIT.observe(time.perf_counter() - started, query=query_name)
+            return await asyncio.to_thread(self._execute_query, query, result_format, query_name)
+
+    @staticmethod
+    def _create_shared_cache() -> Optional[SharedResultCache]:
+        """Open the cross-worker cache file, or return None if it is disabled or unusable"""
+        if not settings.shared_cache_enabled:
+            return None
+
+        try:
+            return SharedResultCache(
+                settings.shared_cache_path,
+                ttl_seconds=settings.cache_ttl_seconds,
+                max_bytes=settings.shared_cache_max_mb * 1024 * 1024,
+                lease_seconds=settings.shared_cache_lease_seconds
+            )
+        except Exception as e:
+            print(f"Error opening shared cache {settings.shared_cache_path}: {e}")
+            return None
+
+    async def _cached(self, method: str, args: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return a cached result for `method` called with `args`, loading it if needed
+
+        Loads are coalesced, so concurrent identical calls share one set of
+        BigQuery jobs. Only successful query results reach the cache; loader
+        exceptions propagate so callers can fall back without caching mock data.
+        While the circuit breaker is not closed, or when the load timed out,
+        a failed load returns the last good result for `key` whatever its age,
+        if one is still cached.
+        """
+        key = (method,) + args
+
+        async def load_and_store() -> Any:
+            # Stored by the shared load itself, since every caller awaiting it may give up first.
+            # A result read from the shared cache keeps its age, so it expires here when it does there
+            value, age = await self._load_shared(key, loader)
+            if self.cache is not None:
+                self.cache.set(key, value, age=age)
+            return value
+
+        def load() -> Awaitable[Any]:
+            return self.single_flight.do(key, load_and_store)
+
+        try:
+            if self.cache is None:
+                return await load()
+            return await self.cache.get_or_load(key, load)
+        except Exception as e:
+            late = isinstance(e, TimeoutError)
+            deadline = current_deadline()
+            if late and deadline is not None:
+                deadline.miss(method)
+
+            last_good = self.cache.get(key) if self.cache is not None else None
+            if last_good is None or (self.warehouse_available and not late):
+                raise
+            STALE_RESULTS.inc(method=method)
+            return last_good
+
+    @property
+    def warehouse_available(self) -> bool:
+        """False while the circuit breaker is open or probing, i.e. results may be stale"""
+        return self.breaker is None or self.breaker.is_closed
+
+    async def _load_shared(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Tuple[Any, float]:
+        """
+        Return a fresh result another worker stored under `key`, or load and share it
+
+        While another worker holds the load lease for `key`, this one polls for
+        its result instead of running the same query, up to the lease timeout.
+
+        Returns:
+            The result and its age in seconds (0 if loaded here)
+        """
+        shared = self.shared_cache
+        if shared is None:
+            return await loader(), 0.0
+
+        deadline = time.monotonic() + shared.lease_seconds
+        waited = False
+
+        while True:
+            hit = await asyncio.to_thread(shared.get, key)
+            if hit is not None:
+                return hit
+            if await asyncio.to_thread(shared.try_lease, key) or time.monotonic() >= deadline:
+                break
+            if not waited:
+                shared.count_lease_wait()
+                waited = True
+            await asyncio.sleep(SHARED_CACHE_POLL_SECONDS)
+
+        try:
+            value = await loader()
+            await asyncio.to_thread(shared.set, key, value)
+            return value, 0.0
+        finally:
+            await asyncio.to_thread(shared.release, key)
+
+    def get_cache_stats(self) -> Dict:
+        """Return result cache and request coalescing counters"""
+        if self.cache is None:
+            stats = {'enabled': False}
+        else:
+            stats = {'enabled': True, 'ttl_seconds': self.cache.ttl_seconds, **self.cache.stats()}
+
+        stats['shared'] = self.shared_cache.stats() if self.shared_cache is not None else {'enabled': False}
+        stats['single_flight'] = self.single_flight.stats()
+        stats['circuit_breaker'] = self.breaker.stats() if self.breaker is not None else {'enabled': False}
+        return stats
+
+    async def _load_rollup_watermark(self) -> None:
+        """Refresh the rollup watermark used to route queries to the daily rollup"""
+        if not settings.rollup_enabled:
+            return
+
+        try:
+            self.rollup_watermark = await self._cached('rollup_watermark', (), self._fetch_rollup_watermark)
+        except Exception as e:
+            print(f"Error fetching rollup watermark: {e}")
+            self.rollup_watermark = None
+
+    async def _fetch_rollup_watermark(self):
+        """Query the first date not covered by the daily rollup, or None if it is empty"""
+        row = await self._execute_query_async(
+            build_watermark_sql(self.project_id, self.dataset_id, settings.rollup_table),
+            result_format='scalar',
+            query_name='rollup_watermark'
+        )
+        return as_date(row.get('watermark'))
+
+    def _build_daily_source(self, start_date: datetime, end_date: datetime, distinct_counts: bool = False) -> str:
+        """
+        Build the `daily` CTE reading rolled-up days from the rollup (when
+        available) and the rest raw
+
+        Args:
+            distinct_counts: Include the distinct-count sketches (NULL otherwise)
+        """
+        if self.rollup_watermark is None:
+            raw = build_raw_daily_aggregate_sql(
+                self.project_id, self.dataset_id, start_date.date(), end_date.date(), distinct_counts
+            )
+            return f"WITH daily AS ({raw}\n        )"
+
+        return build_daily_source_sql(
+            self.project_id,
+            self.dataset_id,
+            settings.rollup_table,
+            start_date.date(),
+            end_date.date(),
+            self.rollup_watermark,
+            distinct_counts
+        )
+
+    def collect_metrics(self):
+        """Report result cache and request coalescing counters for /metrics"""
+        if self.cache is not None:
+            stats = self.cache.stats()
+            yield (
+                "dashboard_result_cache_events_total",
+                "counter",
+                "Result cache events by type",
+                [
+                    ({'event': event}, stats[event])
+                    for event in ('hits', 'stale_hits', 'misses', 'refreshes', 'refresh_failures', 'evictions')
+                ]
+            )
+            yield ("dashboard_result_cache_entries", "gauge", "Entries in the result cache", [({}, stats['size'])])
+
+        if self.shared_cache is not None:
+            stats = self.shared_cache.stats()
+            yield (
+                "dashboard_shared_cache_events_total",
+                "counter",
+                "Cross-worker shared cache events in this process by type",
+                [
+                    ({'event': event}, stats[event])
+                    for event in ('hits', 'misses', 'writes', 'evictions', 'lease_waits', 'errors')
+                ]
+            )
+            yield ("dashboard_shared_cache_bytes", "gauge", "Bytes of values in the shared cache file", [({}, stats['bytes'])])
+
+        if self.breaker is not None:
+            state = self.breaker.state
+            yield (
+                "dashboard_circuit_state",
+                "gauge",
+                "Warehouse circuit breaker state (1 for the current state)",
+                [({'state': name}, int(name == state)) for name in ('closed', 'open', 'half_open')]
+            )
+
+        flights = self.single_flight.stats()
+        yield (
+            "dashboard_single_flight_total",
+            "counter",
+            "Warehouse loads executed vs coalesced onto an in-flight load",
+            [({'outcome': 'executed'}, flights['executions']), ({'outcome': 'coalesced'}, flights['coalesced'])]
+        )
+
+    async def get_dashboard_data(
+        self,
+        days: int = 30,
+        periods: int = 2,
+        timing: Optional[ServerTiming] = None,
+        datasets: Iterable[str] = DASHBOARD_DATASETS,
+        deadline: Optional[Deadline] = None,
+        granularity: str = 'day'
+    ) -> Dict:
+        """
+        Fetch every dataset the executive dashboard needs concurrently
+
+        All BigQuery jobs are submitted at once and awaited together, so the
+        request costs roughly one round-trip instead of the sum of all of them.
+        With a deadline, every query's timeout is the budget left, and a
+        dataset still missing when it runs out is filled with its last good
+        cached result (or fallback data) and recorded in `deadline.missed`.
 
         Args:
             days: Number of days to look back
+            periods: Number of consecutive incident metric periods to compute
+            timing: Optional recorder for a per-fetch Server-Timing breakdown
+            datasets: Datasets to fetch (default: all); the others are not queried
+            deadline: Optional budget for all of the request's queries
+            granularity: Trend bucket width: 'minute', 'hour' or 'day'
 
         Returns:
-            Dictionary with current and previous period metrics
+            Dictionary with the requested datasets among incident_data,
+            agent_data, trend_data and severity_data
         """
-        # Calculate date ranges
-        end_date = datetime.now()
-        current_start = end_date - timedelta(days=days)
-        previous_start = current_start - timedelta(days=days)
-        previous_end = current_start
+        fetches = {
+            'incident_data': (
+                'bq-incidents', 'Incident metrics',
+                lambda: self.get_incident_metrics_async(days=days, periods=periods),
+                ('incident_metrics', days, periods), lambda: self._get_fallback_metrics(days, periods)
+            ),
+            'agent_data': (
+                'bq-agent', 'Agent metrics',
+                lambda: self.get_agent_metrics_async(days=days, periods=periods),
+                ('agent_metrics', days, periods), lambda: self._get_fallback_agent_metrics(days, periods)
+            ),
+            'trend_data': (
+                'bq-trend', 'Incident trend',
+                lambda: self.get_trend_data_async(days=days, granularity=granularity),
+                ('trend', days, granularity), lambda: self._get_fallback_trend_data(days, granularity)
+            ),
+            'severity_data': (
+                'bq-severity', 'Severity distribution',
+                lambda: self.get_severity_distribution_async(days=days),
+                ('severity', days), self._get_fallback_severity_data
+            ),
+        }
+        selected = [dataset for dataset in fetches if dataset in datasets]
 
-        # Query for current period
-        current_query = f"""
-        SELECT
-            COUNT(*) as total_incidents,
-            COUNTIF(severity = 'CRITICAL' OR severity = 'Critical') as critical_incidents,
-            AVG(TIMESTAMP_DIFF(response_time, detection_time, MINUTE)) as avg_response_time,
-            COUNTIF(status = 'RESOLVED' OR status = 'Resolved') * 100.0 / COUNT(*) as resolved_rate,
-            COUNTIF(is_false_positive = TRUE) * 100.0 / COUNT(*) as false_positive_rate
-        FROM `{self.project_id}.{self.dataset_id}.activity_logs`
-        WHERE timestamp >= TIMESTAMP('{current_start.strftime('%Y-%m-%d')}')
-          AND timestamp < TIMESTAMP('{end_date.strftime('%Y-%m-%d')}')
+        with bind_deadline(deadline):
+            results = await asyncio.gather(*[
+                self._fetch_within(fetch(), name, description, timing, deadline, key, fallback)
+                for name, description, fetch, key, fallback in (fetches[dataset] for dataset in selected)
+            ])
+
+        return dict(zip(selected, results))
+
+    async def _fetch_within(
+        self,
+        fetch: Awaitable[Any],
+        name: str,
+        description: str,
+        timing: Optional[ServerTiming],
+        deadline: Optional[Deadline],
+        key: Tuple,
+        fallback: Callable[[], Any]
+    ) -> Any:
         """
+        Await one dashboard fetch, giving up when the request deadline runs out
 
-        # Query for previous period
-        previous_query = f"""
-        SELECT
-            COUNT(*) as total_incidents,
-            COUNTIF(severity = 'CRITICAL' OR severity = 'Critical') as critical_incidents,
-            AVG(TIMESTAMP_DIFF(response_time, detection_time, MINUTE)) as avg_response_time,
-            COUNTIF(status = 'RESOLVED' OR status = 'Resolved') * 100.0 / COUNT(*) as resolved_rate,
-            COUNTIF(is_false_positive = TRUE) * 100.0 / COUNT(*) as false_positive_rate
-        FROM `{self.project_id}.{self.dataset_id}.activity_logs`
-        WHERE timestamp >= TIMESTAMP('{previous_start.strftime('%Y-%m-%d')}')
-          AND timestamp < TIMESTAMP('{previous_end.strftime('%Y-%m-%d')}')
+        A fetch that misses the deadline is recorded in `deadline.missed` and
+        replaced by the last good result cached under `key`, or by `fallback()`.
+        The first miss of a request counts as a circuit breaker failure, so a
+        hanging warehouse opens the circuit without waiting out query timeouts.
+        Only this wait is cut short: the coalesced load behind it is not bound
+        by the deadline, keeps running up to QUERY_TIMEOUT_SECONDS and still
+        fills the cache.
         """
+        if timing:
+            fetch = timing.measure_async(name, fetch, description)
+        if deadline is None:
+            return await fetch
 
         try:
-            current_df = self._execute_query(current_query)
-            previous_df = self._execute_query(previous_query)
-
-            current_metrics = {
-                'total_incidents': int(current_df['total_incidents'].iloc[0]) if len(current_df) > 0 else 0,
-                'critical_incidents': int(current_df['critical_incidents'].iloc[0]) if len(current_df) > 0 else 0,
-                'avg_response_time': float(current_df['avg_response_time'].iloc[0]) if len(current_df) > 0 and pd.notna(current_df['avg_response_time'].iloc[0]) else 30.0,
-                'resolved_rate': float(current_df['resolved_rate'].iloc[0]) if len(current_df) > 0 and pd.notna(current_df['resolved_rate'].iloc[0]) else 90.0,
-                'false_positive_rate': float(current_df['false_positive_rate'].iloc[0]) if len(current_df) > 0 and pd.notna(current_df['false_positive_rate'].iloc[0]) else 5.0,
+            return await asyncio.wait_for(fetch, deadline.remaining())
+        except asyncio.TimeoutError:
+            print(f"{description} missed the {deadline.seconds:g}s request deadline")
+            if self.breaker is not None and not deadline.missed:
+                self.breaker.record_failure()
+            deadline.miss(key[0])
+            last_good = self.cache.get(key) if self.cache is not None else None
+            if last_good is not None:
+                STALE_RESULTS.inc(method=key[0])
+                return last_good
+            return fallback()
+
+    async def get_dashboard_batch(
+        self,
+        windows: List[int],
+        periods: int = 2,
+        timing: Optional[ServerTiming] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[int, Dict]:
+        """
+        Fetch dashboard data for several `days` windows from one scan
+
+        A single query aggregates activity per (date, severity) over the
+        longest lookback any window needs (largest window × periods), and
+        another aggregates agent metrics per date; every window's incident
+        metrics, agent metrics, trend and severity distribution are then
+        folded from those daily rows. The folded results also seed the
+        per-window result cache, so follow-up single-window requests are free.
+
+        Args:
+            windows: `days` values to build, e.g. [7, 30, 90, 365]
+            periods: Number of consecutive incident metric periods per window
+            timing: Optional recorder for a per-fetch Server-Timing breakdown
+            deadline: Optional budget for all of the request's queries
+
+        Returns:
+            Dictionary of days to get_dashboard_data-style results
+        """
+        lookback_days = max(windows) * periods
+        fetches = [
+            self._fetch_within(
+                self.get_daily_aggregates_async(lookback_days), 'bq-daily', 'Daily aggregates',
+                timing, deadline, ('daily_aggregates', lookback_days), lambda: None
+            ),
+            self._fetch_within(
+                self.get_daily_agent_aggregates_async(lookback_days), 'bq-agent', 'Daily agent metrics',
+                timing, deadline, ('daily_agent_aggregates', lookback_days), lambda: None
+            )
+        ]
+        if settings.distinct_counts_enabled:
+            # Daily HyperLogLog sketches are too large to fold here; merge them per window in the warehouse
+            fetches.append(self._fetch_within(
+                self.get_window_unique_counts_async(windows, periods), 'bq-unique', 'Unique counts',
+                timing, deadline, ('window_unique_counts', tuple(windows), periods), lambda: None
+            ))
+        with bind_deadline(deadline):
+            daily, daily_agent, *unique_counts = await asyncio.gather(*fetches)
+        unique_counts = unique_counts[0] if unique_counts else None
+
+        batch = {}
+        seeds = []
+        for days in windows:
+            if daily_agent is None:
+                agent_data = self._get_fallback_agent_metrics(days, periods)
+            else:
+                agent_data = self._fold_agent_metrics(daily_agent, days, periods)
+                seeds.append((('agent_metrics', days, periods), agent_data))
+
+            if daily is None:
+                batch[days] = {
+                    'incident_data': self._get_fallback_metrics(days, periods),
+                    'agent_data': agent_data,
+                    'trend_data': self._get_fallback_trend_data(days),
+                    'severity_data': self._get_fallback_severity_data()
+                }
+                continue
+
+            batch[days] = {
+                'incident_data': self._fold_incident_metrics(
+                    daily, days, periods, unique_counts.get(days, {}) if unique_counts is not None else None
+                ),
+                'agent_data': agent_data,
+                'trend_data': self._fold_trend_data(daily, days),
+                'severity_data': self._fold_severity_data(daily, days)
             }
+            seeds += [
+                (('incident_metrics', days, periods), batch[days]['incident_data']),
+                (('trend', days, 'day'), batch[days]['trend_data']),
+                (('severity', days), batch[days]['severity_data']),
+            ]
+
+        # Folds of last good results served during an outage or after a missed
+        # deadline must not pass for fresh
+        if self.warehouse_available and not (deadline and deadline.missed):
+            await self._seed_cache(seeds)
+        return batch
+
+    async def _seed_cache(self, seeds: List[Tuple[Tuple, Any]]) -> None:
+        """Store results computed elsewhere under the keys _cached would use"""
+        if self.cache is not None:
+            for key, value in seeds:
+                self.cache.set(key, value)
+        if self.shared_cache is not None and seeds:
+            await asyncio.to_thread(self.shared_cache.set_many, seeds)
+
+    async def get_daily_aggregates_async(self, lookback_days: int) -> Optional[List[Tuple]]:
+        """
+        Get per-(date, severity) activity aggregates for the last `lookback_days`
+        days (today excluded), or None if they cannot be fetched
+        """
+        try:
+            return await self._cached(
+                'daily_aggregates',
+                (lookback_days,),
+                lambda: self._fetch_daily_aggregates(lookback_days)
+            )
+
+        except Exception as e:
+            print(f"Error fetching daily aggregates: {e}")
+            return None
+
+    async def _fetch_daily_aggregates(self, lookback_days: int) -> List[Tuple]:
+        """Query and parse daily aggregates, raising on failure"""
+        await self._load_rollup_watermark()
+        batches = await self._execute_query_async(
+            self._build_daily_aggregates_query(lookback_days),
+            result_format='arrow',
+            query_name='daily_aggregates'
+        )
+        return self._parse_daily_aggregates(batches)
+
+    def _build_daily_aggregates_query(self, lookback_days: int) -> str:
+        """Build the per-(date, severity) aggregate query, reading the rollup when available"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=lookback_days)
+
+        return f"""
+        {self._build_daily_source(start_date, end_date)}
+        SELECT {DAILY_FOLD_COLUMNS}
+        FROM daily
+        """
+
+    def _parse_daily_aggregates(self, batches: List) -> List[Tuple]:
+        """
+        Convert daily aggregate Arrow batches to tuples of (date, severity,
+        incidents, resolved, false_positives, response_time_sum,
+        response_time_count, response_time_sketch)
+        """
+        daily = []
+        for batch in batches:
+            columns = [batch.column(name).to_pylist() for name in DAILY_FOLD_COLUMNS.split(', ')]
+            for date, severity, incidents, resolved, false_positives, rt_sum, rt_count, rt_sketch in zip(*columns):
+                daily.append((
+                    as_date(date),
+                    severity,
+                    int(incidents),
+                    int(resolved),
+                    int(false_positives),
+                    int(rt_sum or 0),
+                    int(rt_count),
+                    rt_sketch
+                ))
 
-            previous_metrics = {
-                'total_incidents': int(previous_df['total_incidents'].iloc[0]) if len(previous_df) > 0 else 0,
-                'critical_incidents': int(previous_df['critical_incidents'].iloc[0]) if len(previous_df) > 0 else 0,
-                'avg_response_time': float(previous_df['avg_response_time'].iloc[0]) if len(previous_df) > 0 and pd.notna(previous_df['avg_response_time'].iloc[0]) else 30.0,
-                'resolved_rate': float(previous_df['resolved_rate'].iloc[0]) if len(previous_df) > 0 and pd.notna(previous_df['resolved_rate'].iloc[0]) else 90.0,
-                'false_positive_rate': float(previous_df['false_positive_rate'].iloc[0]) if len(previous_df) > 0 and pd.notna(previous_df['false_positive_rate'].iloc[0]) else 5.0,
+        return daily
+
+    def _fold_incident_metrics(
+        self,
+        daily: List[Tuple],
+        days: int,
+        periods: int,
+        unique_counts: Optional[Dict[int, Dict]] = None
+    ) -> Dict:
+        """
+        Fold daily aggregates into the incident metrics for one window
+
+        Args:
+            unique_counts: Merged distinct-count register statistics of this
+                window by period index (see get_window_unique_counts_async)
+        """
+        today = datetime.now().date()
+        # Per period: incidents, critical, resolved, false positives, response time sum and count
+        totals = [[0] * 6 for _ in range(periods)]
+        # Per period: daily sketch texts, whose comma-joined text is their merge
+        sketches: List[List[str]] = [[] for _ in range(periods)]
+
+        for date, severity, incidents, resolved, false_positives, rt_sum, rt_count, rt_sketch in daily:
+            age = (today - date).days
+            if age < 1 or age > days * periods:
+                continue
+
+            period = totals[(age - 1) // days]
+            period[0] += incidents
+            period[1] += incidents if severity == 'CRITICAL' else 0
+            period[2] += resolved
+            period[3] += false_positives
+            period[4] += rt_sum
+            period[5] += rt_count
+            if rt_sketch:
+                sketches[(age - 1) // days].append(rt_sketch)
+
+        rows = [
+            {
+                'period_index': period_index,
+                'total_incidents': incidents,
+                'critical_incidents': critical,
+                'avg_response_time': rt_sum / rt_count if rt_count else None,
+                'resolved_rate': resolved * 100.0 / incidents,
+                'false_positive_rate': false_positives * 100.0 / incidents,
+                'response_time_sketch': ','.join(sketches[period_index]),
+                **(unique_counts.get(period_index, NO_UNIQUE_VALUES) if unique_counts is not None else {}),
             }
+            for period_index, (incidents, critical, resolved, false_positives, rt_sum, rt_count) in enumerate(totals)
+            if incidents
+        ]
+        return self._parse_incident_metrics(rows, days, periods)
+
+    def _fold_trend_data(self, daily: List[Tuple], days: int) -> List[Dict]:
+        """Fold daily aggregates into the daily incident trend for one window"""
+        today = datetime.now().date()
+        incidents_by_date: Dict = {}
+
+        for date, _, incidents, *_ in daily:
+            if 1 <= (today - date).days <= days:
+                incidents_by_date[date] = incidents_by_date.get(date, 0) + incidents
+
+        return [
+            self._trend_point(date, incidents, 'day')
+            for date, incidents in sorted(incidents_by_date.items())
+        ]
+
+    def _fold_severity_data(self, daily: List[Tuple], days: int) -> List[Dict]:
+        """Fold daily aggregates into the severity distribution for one window"""
+        today = datetime.now().date()
+        counts: Dict = {}
+
+        for date, severity, incidents, *_ in daily:
+            if 1 <= (today - date).days <= days:
+                counts[severity] = counts.get(severity, 0) + incidents
+
+        order = {'CRITICAL': 1, 'HIGH': 2, 'MEDIUM': 3, 'LOW': 4}
+        rows = [
+            {'severity': severity, 'count': count}
+            for severity, count in sorted(counts.items(), key=lambda item: (order.get(item[0], 5), str(item[0])))
+        ]
+        return self._parse_severity_data(rows)
+
+    async def get_daily_agent_aggregates_async(self, lookback_days: int) -> Optional[List[Tuple]]:
+        """
+        Get per-date agent metric sums and counts for the last `lookback_days`
+        days (today excluded), or None if they cannot be fetched
+        """
+        try:
+            return await self._cached(
+                'daily_agent_aggregates',
+                (lookback_days,),
+                lambda: self._fetch_daily_agent_aggregates(lookback_days)
+            )
+
+        except Exception as e:
+            print(f"Error fetching daily agent metrics: {e}")
+            return None
+
+    async def _fetch_daily_agent_aggregates(self, lookback_days: int) -> List[Tuple]:
+        """Query and parse daily agent metric aggregates, raising on failure"""
+        rows = await self._execute_query_async(
+            self._build_daily_agent_aggregates_query(lookback_days),
+            result_format='rows',
+            query_name='daily_agent_metrics'
+        )
+        return [
+            (
+                as_date(row['date']),
+                tuple(
+                    (float(row[f'{field}_sum'] or 0), int(row[f'{field}_count']))
+                    for field in AGENT_METRIC_COLUMNS
+                )
+            )
+            for row in rows
+        ]
+
+    def _build_daily_agent_aggregates_query(self, lookback_days: int) -> str:
+        """Build the per-date agent metric sum and count query"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=lookback_days)
+
+        aggregates = ",".join(
+            f"\n            SUM({column}) as {field}_sum,\n            COUNT({column}) as {field}_count"
+            for field, column in AGENT_METRIC_COLUMNS.items()
+        )
+        return f"""
+        SELECT
+            DATE(timestamp) as date,{aggregates}
+        FROM `{self.project_id}.{self.dataset_id}.agent_metrics`
+        WHERE timestamp >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
+          AND timestamp < TIMESTAMP('{end_date.strftime('%Y-%m-%d')}')
+        GROUP BY date
+        """
+
+    def _fold_agent_metrics(self, daily_agent: List[Tuple], days: int, periods: int) -> Dict:
+        """Fold daily agent metric aggregates into the agent metrics for one window"""
+        today = datetime.now().date()
+        # Per period and metric: sum and count
+        totals = [[[0.0, 0] for _ in AGENT_METRIC_COLUMNS] for _ in range(periods)]
+
+        for date, aggregates in daily_agent:
+            age = (today - date).days
+            if age < 1 or age > days * periods:
+                continue
 
-            return {
-                'current': current_metrics,
-                'previous': previous_metrics
+            for total, (metric_sum, metric_count) in zip(totals[(age - 1) // days], aggregates):
+                total[0] += metric_sum
+                total[1] += metric_count
+
+        rows = [
+            {
+                'period_index': period_index,
+                **{
+                    field: metric_sum / metric_count if metric_count else None
+                    for field, (metric_sum, metric_count) in zip(AGENT_METRIC_COLUMNS, period)
+                }
             }
+            for period_index, period in enumerate(totals)
+        ]
+        return self._parse_agent_metrics(rows, days, periods)
+
+    async def get_incident_metrics_async(self, days: int = 30, periods: int = 2) -> Dict:
+        """
+        Get incident metrics for the current and preceding periods without
+        blocking the event loop
+
+        Args:
+            days: Number of days in each period
+            periods: Number of consecutive periods to compute (minimum 2)
+
+        Returns:
+            Dictionary with current and previous period metrics plus the
+            full period history (oldest first)
+        """
+        try:
+            return await self._cached(
+                'incident_metrics',
+                (days, periods),
+                lambda: self._fetch_incident_metrics(days, periods)
+            )
 
         except Exception as e:
             print(f"Error fetching incident metrics: {e}")
             # Return fallback data
-            return self._get_fallback_metrics()
+            return self._get_fallback_metrics(days, periods)
+
+    async def _fetch_incident_metrics(self, days: int, periods: int) -> Dict:
+        """Query and parse incident metrics, raising on failure"""
+        await self._load_rollup_watermark()
+        rows = await self._execute_query_async(
+            self._build_incident_metrics_query(days, periods),
+            result_format='rows',
+            query_name='incident_metrics'
+        )
+        return self._parse_incident_metrics(rows, days, periods)
+
+    def _build_incident_metrics_query(self, days: int, periods: int) -> str:
+        """
+        Build a single-scan query returning KPIs for consecutive periods
+
+        Rows are bucketed by period_index, where 0 is the most recent
+        `days`-day window ending yesterday, 1 the window before it, and so on.
+        Each period's response-time sketch, and with DISTINCT_COUNTS_ENABLED
+        its distinct-count sketches, are merged from its daily sketches.
+        """
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days * periods)
+        distinct_counts = settings.distinct_counts_enabled
+
+        period_index = f"DIV((DATE_DIFF(DATE('{end_date.strftime('%Y-%m-%d')}'), date, DAY) - 1), {days})"
+
+        unique_columns = unique_join = ""
+        if distinct_counts:
+            unique_columns = "".join(
+                f", COALESCE(uniques.{metric}_{stat}, 0) as {metric}_{stat}"
+                for metric in DISTINCT_COUNTS for stat in ('registers', 'harmonic')
+            )
+            unique_join = f"""
+        LEFT JOIN ({build_merged_distinct_sql({'period_index': period_index})}
+        ) uniques ON uniques.period_index = kpis.period_index"""
+
+        return f"""
+        {self._build_daily_source(start_date, end_date, distinct_counts)}
+        SELECT kpis.*, sketches.response_time_sketch{unique_columns}
+        FROM (
+            SELECT
+                {period_index} as period_index,
+                SUM(incidents) as total_incidents,
+                SUM(IF(severity = 'CRITICAL', incidents, 0)) as critical_incidents,
+                SAFE_DIVIDE(SUM(response_time_sum), SUM(response_time_count)) as avg_response_time,
+                SAFE_DIVIDE(SUM(resolved) * 100.0, SUM(incidents)) as resolved_rate,
+                SAFE_DIVIDE(SUM(false_positives) * 100.0, SUM(incidents)) as false_positive_rate
+            FROM daily
+            GROUP BY period_index
+        ) kpis
+        LEFT JOIN ({build_merged_sketch_sql(period_index, 'period_index')}
+        ) sketches ON sketches.period_index = kpis.period_index{unique_join}
+        ORDER BY kpis.period_index DESC
+        """
+
+    def _parse_incident_metrics(self, rows: List[Dict], days: int, periods: int) -> Dict:
+        """Convert period-bucketed query rows to current, previous and history metrics"""
+        rows_by_period = {int(row['period_index']): row for row in rows}
+
+        history = []
+        for period_index in range(periods - 1, -1, -1):
+            row = rows_by_period.get(period_index)
+            period_start, period_end = self._get_period_dates(days, period_index)
+
+            history.append({
+                'period_index': period_index,
+                'start_date': period_start,
+                'end_date': period_end,
+                'total_incidents': int(row['total_incidents']) if row is not None else 0,
+                'critical_incidents': int(row['critical_incidents']) if row is not None else 0,
+                'avg_response_time': float(row['avg_response_time']) if row is not None and row['avg_response_time'] is not None else 30.0,
+                'resolved_rate': float(row['resolved_rate']) if row is not None and row['resolved_rate'] is not None else 90.0,
+                'false_positive_rate': float(row['false_positive_rate']) if row is not None and row['false_positive_rate'] is not None else 5.0,
+                **self._response_time_percentiles(row['response_time_sketch'] if row is not None else None),
+                **self._unique_counts(row),
+            })
+
+        return {
+            'current': history[-1],
+            'previous': history[-2],
+            'periods': history
+        }
+
+    @staticmethod
+    def _response_time_percentiles(sketch_text: Optional[str]) -> Dict[str, Optional[float]]:
+        """Estimate RESPONSE_TIME_PERCENTILES in minutes from a merged sketch (None without data)"""
+        sketch = QuantileSketch.parse(sketch_text)
+        percentiles = {}
+        for field, q in RESPONSE_TIME_PERCENTILES.items():
+            seconds = sketch.quantile(q)
+            percentiles[field] = seconds / 60 if seconds is not None else None
+        return percentiles
+
+    @staticmethod
+    def _unique_counts(row: Optional[Dict]) -> Dict[str, Optional[int]]:
+        """
+        Estimate DISTINCT_COUNTS metrics from a period row's merged register
+        statistics: 0 for a period without rows, None when disabled or not fetched
+        """
+        counts = {}
+        for metric in DISTINCT_COUNTS:
+            if not settings.distinct_counts_enabled:
+                counts[metric] = None
+            elif row is None:
+                counts[metric] = 0
+            elif row.get(f'{metric}_registers') is None:
+                counts[metric] = None
+            else:
+                counts[metric] = estimate_count(int(row[f'{metric}_registers']), float(row[f'{metric}_harmonic']))
+        return counts
+
+    async def get_window_unique_counts_async(self, windows: List[int], periods: int) -> Optional[Dict]:
+        """
+        Get merged distinct-count register statistics for every period of
+        several `days` windows from one query, or None if they cannot be fetched
+
+        Returns:
+            Dictionary of days to {period_index: {'<metric>_registers': ...,
+            '<metric>_harmonic': ...}}, periods without values omitted
+        """
+        try:
+            return await self._cached(
+                'window_unique_counts',
+                (tuple(windows), periods),
+                lambda: self._fetch_window_unique_counts(windows, periods)
+            )
+
+        except Exception as e:
+            print(f"Error fetching window unique counts: {e}")
+            return None
+
+    async def _fetch_window_unique_counts(self, windows: List[int], periods: int) -> Dict:
+        """Query and parse per-window unique count statistics, raising on failure"""
+        await self._load_rollup_watermark()
+        rows = await self._execute_query_async(
+            self._build_window_unique_counts_query(windows, periods),
+            result_format='rows',
+            query_name='unique_counts'
+        )
 
-    def get_trend_data(self, days: int = 30) -> List[Dict]:
+        counts: Dict[int, Dict] = {days: {} for days in windows}
+        for row in rows:
+            counts[int(row['window_days'])][int(row['period_index'])] = {
+                f'{metric}_{stat}': row[f'{metric}_{stat}']
+                for metric in DISTINCT_COUNTS for stat in ('registers', 'harmonic')
+            }
+        return counts
+
+    def _build_window_unique_counts_query(self, windows: List[int], periods: int) -> str:
+        """Build a query merging each window's daily distinct-count sketches per period"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=max(windows) * periods)
+        age = f"DATE_DIFF(DATE('{end_date.strftime('%Y-%m-%d')}'), date, DAY)"
+
+        merged = build_merged_distinct_sql(
+            {'window_days': 'window_days', 'period_index': f"DIV(({age} - 1), window_days)"},
+            source=f"daily CROSS JOIN UNNEST([{', '.join(str(days) for days in windows)}]) AS window_days",
+            where=f"{age} <= window_days * {periods}"
+        )
+        return f"""
+        {self._build_daily_source(start_date, end_date, distinct_counts=True)}
+        {merged}
+        """
+
+    async def get_unique_counts_async(self, days: int = 30, periods: int = 2, exact: bool = False) -> Dict:
+        """
+        Get DISTINCT_COUNTS metrics for consecutive periods
+
+        Approximate counts merge the daily HyperLogLog sketches; exact counts
+        run COUNT(DISTINCT) over raw activity_logs, for audits. Failures raise
+        rather than fall back to mock data.
+
+        Args:
+            days: Number of days in each period
+            periods: Number of consecutive periods
+            exact: Count exactly instead of estimating
+
+        Returns:
+            Dictionary with the mode, its relative standard error and the
+            counts of each period (oldest first)
+        """
+        periods_counts = await self._cached(
+            'unique_counts',
+            (days, periods, exact),
+            lambda: self._fetch_unique_counts(days, periods, exact)
+        )
+        return {
+            'mode': 'exact' if exact else 'approximate',
+            'relative_standard_error': 0.0 if exact else STANDARD_ERROR,
+            'periods': periods_counts
+        }
+
+    async def _fetch_unique_counts(self, days: int, periods: int, exact: bool) -> List[Dict]:
+        """Query and parse per-period unique counts, raising on failure"""
+        if not exact:
+            await self._load_rollup_watermark()
+        rows = await self._execute_query_async(
+            self._build_unique_counts_query(days, periods, exact),
+            result_format='rows',
+            query_name='unique_counts_exact' if exact else 'unique_counts'
+        )
+        rows_by_period = {int(row['period_index']): row for row in rows}
+
+        history = []
+        for period_index in range(periods - 1, -1, -1):
+            row = rows_by_period.get(period_index)
+            period_start, period_end = self._get_period_dates(days, period_index)
+            if exact:
+                counts = {metric: int(row[metric]) if row is not None else 0 for metric in DISTINCT_COUNTS}
+            else:
+                counts = self._unique_counts(row)
+            history.append({
+                'period_index': period_index,
+                'start_date': period_start,
+                'end_date': period_end,
+                **counts
+            })
+        return history
+
+    def _build_unique_counts_query(self, days: int, periods: int, exact: bool) -> str:
+        """Build a query returning DISTINCT_COUNTS per period, exact or as sketch statistics"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days * periods)
+        end_day = end_date.strftime('%Y-%m-%d')
+
+        if not exact:
+            merged = build_merged_distinct_sql(
+                {'period_index': f"DIV((DATE_DIFF(DATE('{end_day}'), date, DAY) - 1), {days})"}
+            )
+            return f"""
+        {self._build_daily_source(start_date, end_date, distinct_counts=True)}
+        {merged}
+        """
+
+        counts = ",".join(
+            f"\n            COUNT(DISTINCT {column}) as {metric}"
+            for metric, (column, _) in DISTINCT_COUNTS.items()
+        )
+        return f"""
+        SELECT
+            DIV((DATE_DIFF(DATE('{end_day}'), DATE(timestamp), DAY) - 1), {days}) as period_index,{counts}
+        FROM `{self.project_id}.{self.dataset_id}.activity_logs`
+        WHERE timestamp >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
+          AND timestamp < TIMESTAMP('{end_day}')
+        GROUP BY period_index
+        """
+
+    def _get_period_dates(self, days: int, period_index: int) -> Tuple[str, str]:
+        """Return the (start, end) dates of a period, end exclusive, as YYYY-MM-DD strings"""
+        period_end = datetime.now() - timedelta(days=days * period_index)
+        period_start = period_end - timedelta(days=days)
+        return period_start.strftime('%Y-%m-%d'), period_end.strftime('%Y-%m-%d')
+
+    async def get_trend_data_async(self, days: int = 30, granularity: str = 'day') -> List[Dict]:
         """
-        Get daily incident trend data
+        Get incident trend data without blocking the event loop
 
         Args:
             days: Number of days to look back
+            granularity: Bucket width: 'minute', 'hour' or 'day'
 
         Returns:
-            List of daily incident counts
+            List of incident counts per bucket, downsampled to TREND_MAX_POINTS
+        """
+        try:
+            return await self._cached(
+                'trend',
+                (days, granularity),
+                lambda: self._fetch_trend_data(days, granularity)
+            )
+
+        except Exception as e:
+            print(f"Error fetching trend data: {e}")
+            return self._get_fallback_trend_data(days, granularity)
+
+    async def _fetch_trend_data(self, days: int, granularity: str) -> List[Dict]:
+        """Query and parse trend data, raising on failure"""
+        if granularity == 'day':
+            await self._load_rollup_watermark()
+        batches = await self._execute_query_async(
+            self._build_trend_query(days, granularity),
+            result_format='arrow',
+            query_name='trend'
+        )
+        return self._parse_trend_data(batches, days, granularity)
+
+    def _build_trend_query(self, days: int, granularity: str = 'day') -> str:
+        """
+        Build the incident trend query
+
+        Daily trends cover the `days` full days before today and read the
+        rollup when available. Hourly and minute trends cover the last `days`
+        days up to now, including the current bucket, from raw rows.
+        """
+        if granularity != 'day':
+            start_time, end_time = self._get_trend_window(days, granularity)
+            return f"""
+        SELECT
+            TIMESTAMP_TRUNC(timestamp, {granularity.upper()}) as date,
+            COUNT(*) as incidents
+        FROM `{self.project_id}.{self.dataset_id}.activity_logs`
+        WHERE timestamp >= TIMESTAMP('{start_time.strftime('%Y-%m-%d %H:%M:%S')}')
+          AND timestamp < TIMESTAMP('{end_time.strftime('%Y-%m-%d %H:%M:%S')}')
+        GROUP BY date
+        ORDER BY date ASC
         """
+
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        query = f"""
+        if self.rollup_watermark is not None:
+            return f"""
+        {self._build_daily_source(start_date, end_date)}
+        SELECT
+            date,
+            SUM(incidents) as incidents
+        FROM daily
+        GROUP BY date
+        ORDER BY date ASC
+        """
+
+        return f"""
         SELECT
             DATE(timestamp) as date,
             COUNT(*) as incidents
@@ -122,25 +1232,63 @@ class BigQueryService:
         ORDER BY date ASC
         """
 
-        try:
-            df = self._execute_query(query)
+    @staticmethod
+    def _get_trend_window(days: int, granularity: str) -> Tuple[datetime, datetime]:
+        """
+        Return the first bucket start and the (exclusive) end of an hourly or
+        minute trend, as UTC datetimes: BigQuery reads the TIMESTAMP literals
+        built from them as UTC, and points are labelled in UTC
+        """
+        step = TREND_GRANULARITIES[granularity][0]
+        end_time = datetime.now(timezone.utc).replace(microsecond=0)
+        start_time = end_time - timedelta(days=days)
+        # Align the first bucket to a bucket boundary
+        start_time -= (start_time - datetime.min.replace(tzinfo=timezone.utc)) % step
+        return start_time, end_time
 
-            trend_data = []
-            for _, row in df.iterrows():
-                trend_data.append({
-                    'date': row['date'].strftime('%b %d'),
-                    'incidents': int(row['incidents'])
-                })
+    def _parse_trend_data(self, batches: List, days: int = 30, granularity: str = 'day') -> List[Dict]:
+        """
+        Convert trend query Arrow batches to incident counts per bucket
 
-            return trend_data
+        Hourly and minute series are zero-filled, so quiet periods show as
+        troughs rather than being skipped, then downsampled to TREND_MAX_POINTS
+        with LTTB, which keeps spikes.
+        """
+        counts = {}
+        for batch in batches:
+            buckets = batch.column('date').to_pylist()
+            incidents = batch.column('incidents').to_pylist()
+            for bucket, count in zip(buckets, incidents):
+                if granularity != 'day':
+                    # Naive buckets are already UTC
+                    bucket = bucket.astimezone(timezone.utc) if bucket.tzinfo is not None else bucket.replace(tzinfo=timezone.utc)
+                counts[bucket] = int(count)
 
-        except Exception as e:
-            print(f"Error fetching trend data: {e}")
-            return self._get_fallback_trend_data(days)
+        if granularity == 'day':
+            buckets = sorted(counts)
+        else:
+            step = TREND_GRANULARITIES[granularity][0]
+            bucket, end_time = self._get_trend_window(days, granularity)
+            buckets = []
+            while bucket < end_time:
+                buckets.append(bucket)
+                bucket += step
+
+        trend_data = [self._trend_point(bucket, counts.get(bucket, 0), granularity) for bucket in buckets]
+        return downsample(trend_data, 'incidents', settings.trend_max_points)
 
-    def get_severity_distribution(self, days: int = 30) -> List[Dict]:
+    @staticmethod
+    def _trend_point(bucket, incidents: int, granularity: str) -> Dict:
+        """Build one trend point: chart label, ISO bucket start and incident count"""
+        return {
+            'date': bucket.strftime(TREND_GRANULARITIES[granularity][1]),
+            'timestamp': bucket.isoformat() if granularity == 'day' else bucket.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'incidents': incidents
+        }
+
+    async def get_severity_distribution_async(self, days: int = 30) -> List[Dict]:
         """
-        Get incident distribution by severity
+        Get incident distribution by severity without blocking the event loop
 
         Args:
             days: Number of days to look back
@@ -148,10 +1296,47 @@ class BigQueryService:
         Returns:
             List of severity counts with colors
         """
+        try:
+            return await self._cached('severity', (days,), lambda: self._fetch_severity_data(days))
+
+        except Exception as e:
+            print(f"Error fetching severity distribution: {e}")
+            return self._get_fallback_severity_data()
+
+    async def _fetch_severity_data(self, days: int) -> List[Dict]:
+        """Query and parse the severity distribution, raising on failure"""
+        await self._load_rollup_watermark()
+        rows = await self._execute_query_async(
+            self._build_severity_query(days),
+            result_format='rows',
+            query_name='severity'
+        )
+        return self._parse_severity_data(rows)
+
+    def _build_severity_query(self, days: int) -> str:
+        """Build the severity distribution query"""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
 
-        query = f"""
+        if self.rollup_watermark is not None:
+            return f"""
+        {self._build_daily_source(start_date, end_date)}
+        SELECT
+            severity,
+            SUM(incidents) as count
+        FROM daily
+        GROUP BY severity
+        ORDER BY
+            CASE severity
+                WHEN 'CRITICAL' THEN 1
+                WHEN 'HIGH' THEN 2
+                WHEN 'MEDIUM' THEN 3
+                WHEN 'LOW' THEN 4
+                ELSE 5
+            END
+        """
+
+        return f"""
         SELECT
             UPPER(severity) as severity,
             COUNT(*) as count
@@ -169,6 +1354,8 @@ class BigQueryService:
             END
         """
 
+    def _parse_severity_data(self, rows: List[Dict]) -> List[Dict]:
+        """Convert severity query rows to a list of severity counts with colors"""
         severity_colors = {
             'CRITICAL': '#EF4444',
             'HIGH': '#F59E0B',
@@ -176,84 +1363,141 @@ class BigQueryService:
             'LOW': '#10B981'
         }
 
-        try:
-            df = self._execute_query(query)
+        severity_data = []
+        for row in rows:
+            severity = row['severity']
+            severity_data.append({
+                'name': severity.capitalize(),
+                'value': int(row['count']),
+                'color': severity_colors.get(severity, '#64748B')
+            })
+
+        return severity_data
 
-            severity_data = []
-            for _, row in df.iterrows():
-                severity = row['severity']
-                severity_data.append({
-                    'name': severity.capitalize(),
-                    'value': int(row['count']),
-                    'color': severity_colors.get(severity, '#64748B')
-                })
+    async def get_agent_metrics_async(self, days: int = 30, periods: int = 2) -> Dict:
+        """
+        Get agent performance metrics for the current and preceding periods
+        without blocking the event loop
+
+        Args:
+            days: Number of days in each period
+            periods: Number of consecutive periods to compute (minimum 2)
 
-            return severity_data
+        Returns:
+            Dictionary with current and previous period MTTD, MTTR and other
+            agent metrics plus the full period history (oldest first)
+        """
+        try:
+            return await self._cached(
+                'agent_metrics',
+                (days, periods),
+                lambda: self._fetch_agent_metrics(days, periods)
+            )
 
         except Exception as e:
-            print(f"Error fetching severity distribution: {e}")
-            return self._get_fallback_severity_data()
+            print(f"Error fetching agent metrics: {e}")
+            return self._get_fallback_agent_metrics(days, periods)
+
+    async def _fetch_agent_metrics(self, days: int, periods: int) -> Dict:
+        """Query and parse agent metrics, raising on failure"""
+        rows = await self._execute_query_async(
+            self._build_agent_metrics_query(days, periods),
+            result_format='rows',
+            query_name='agent_metrics'
+        )
+        return self._parse_agent_metrics(rows, days, periods)
 
-    def get_agent_metrics(self) -> Dict:
+    def _build_agent_metrics_query(self, days: int, periods: int) -> str:
         """
-        Get agent performance metrics from agent_metrics table
+        Build a single-scan query returning agent metrics for consecutive periods
 
-        Returns:
-            Dictionary with MTTD, MTTR, and other agent metrics
+        Periods are those of the incident metrics query: period_index 0 is
+        the `days`-day window ending yesterday, 1 the window before it, and so on.
         """
-        query = f"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days * periods)
+        end_day = end_date.strftime('%Y-%m-%d')
+
+        averages = ",".join(
+            f"\n            AVG({column}) as {field}"
+            for field, column in AGENT_METRIC_COLUMNS.items()
+        )
+        return f"""
         SELECT
-            AVG(detection_time_minutes) as mttd,
-            AVG(response_time_minutes) as mttr,
-            AVG(resolution_time_minutes) as mttr_resolve,
-            AVG(security_score) as security_score
+            DIV((DATE_DIFF(DATE('{end_day}'), DATE(timestamp), DAY) - 1), {days}) as period_index,{averages}
         FROM `{self.project_id}.{self.dataset_id}.agent_metrics`
-        WHERE timestamp >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 30 DAY)
+        WHERE timestamp >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
+          AND timestamp < TIMESTAMP('{end_day}')
+        GROUP BY period_index
         """
 
-        try:
-            df = self._execute_query(query)
-
-            if len(df) > 0:
-                return {
-                    'mttd': float(df['mttd'].iloc[0]) if pd.notna(df['mttd'].iloc[0]) else 25.0,
-                    'mttr': float(df['mttr'].iloc[0]) if pd.notna(df['mttr'].iloc[0]) else 45.0,
-                    'mttr_resolve': float(df['mttr_resolve'].iloc[0]) if pd.notna(df['mttr_resolve'].iloc[0]) else 360.0,
-                    'security_score': int(df['security_score'].iloc[0]) if pd.notna(df['security_score'].iloc[0]) else 85,
-                }
-            else:
-                return self._get_fallback_agent_metrics()
+    def _parse_agent_metrics(self, rows: List[Dict], days: int, periods: int) -> Dict:
+        """Convert period-bucketed agent metric rows to current, previous and history metrics"""
+        rows_by_period = {int(row['period_index']): row for row in rows}
 
-        except Exception as e:
-            print(f"Error fetching agent metrics: {e}")
-            return self._get_fallback_agent_metrics()
+        history = []
+        for period_index in range(periods - 1, -1, -1):
+            row = rows_by_period.get(period_index)
+            period_start, period_end = self._get_period_dates(days, period_index)
 
-    def _get_fallback_metrics(self) -> Dict:
-        """Return fallback metrics when BigQuery is unavailable"""
-        import random
+            history.append({
+                'period_index': period_index,
+                'start_date': period_start,
+                'end_date': period_end,
+                'mttd': float(row['mttd']) if row is not None and row['mttd'] is not None else 25.0,
+                'mttr': float(row['mttr']) if row is not None and row['mttr'] is not None else 45.0,
+                'mttr_resolve': float(row['mttr_resolve']) if row is not None and row['mttr_resolve'] is not None else 360.0,
+                'security_score': int(row['security_score']) if row is not None and row['security_score'] is not None else 85,
+            })
 
-        current = {
-            'total_incidents': random.randint(80, 150),
-            'critical_incidents': random.randint(5, 15),
-            'avg_response_time': random.uniform(15, 45),
-            'resolved_rate': random.uniform(85, 98),
-            'false_positive_rate': random.uniform(3, 12),
+        return {
+            'current': history[-1],
+            'previous': history[-2],
+            'periods': history
         }
 
-        previous = {k: v * random.uniform(0.85, 1.15) for k, v in current.items()}
+    def _get_fallback_metrics(self, days: int = 30, periods: int = 2) -> Dict:
+        """Return fallback metrics when BigQuery is unavailable"""
+        import random
+
+        history = []
+        for period_index in range(periods - 1, -1, -1):
+            period_start, period_end = self._get_period_dates(days, period_index)
+            p50 = random.uniform(10, 30)
+            history.append({
+                'period_index': period_index,
+                'start_date': period_start,
+                'end_date': period_end,
+                'total_incidents': random.randint(80, 150),
+                'critical_incidents': random.randint(5, 15),
+                'avg_response_time': random.uniform(15, 45),
+                'resolved_rate': random.uniform(85, 98),
+                'false_positive_rate': random.uniform(3, 12),
+                'response_time_p50': p50,
+                'response_time_p90': p50 * random.uniform(2, 3),
+                'response_time_p99': p50 * random.uniform(4, 6),
+                'unique_source_ips': random.randint(300, 900) if settings.distinct_counts_enabled else None,
+                'unique_assets': random.randint(80, 250) if settings.distinct_counts_enabled else None,
+            })
 
-        return {'current': current, 'previous': previous}
+        return {'current': history[-1], 'previous': history[-2], 'periods': history}
 
-    def _get_fallback_trend_data(self, days: int) -> List[Dict]:
+    def _get_fallback_trend_data(self, days: int, granularity: str = 'day') -> List[Dict]:
         """Return fallback trend data"""
         import random
+        if granularity != 'day':
+            step = TREND_GRANULARITIES[granularity][0]
+            bucket, end_time = self._get_trend_window(days, granularity)
+            trend_data = []
+            while bucket < end_time:
+                trend_data.append(self._trend_point(bucket, random.randint(0, 3), granularity))
+                bucket += step
+            return downsample(trend_data, 'incidents', settings.trend_max_points)
+
         trend_data = []
         for i in range(days):
             date = datetime.now() - timedelta(days=days - i - 1)
-            trend_data.append({
-                'date': date.strftime('%b %d'),
-                'incidents': random.randint(2, 8)
-            })
+            trend_data.append(self._trend_point(date.date(), random.randint(2, 8), 'day'))
         return trend_data
 
     def _get_fallback_severity_data(self) -> List[Dict]:
@@ -266,15 +1510,25 @@ class BigQueryService:
             {'name': 'Low', 'value': random.randint(15, 30), 'color': '#10B981'}
         ]
 
-    def _get_fallback_agent_metrics(self) -> Dict:
+    def _get_fallback_agent_metrics(self, days: int = 30, periods: int = 2) -> Dict:
         """Return fallback agent metrics"""
         import random
-        return {
-            'mttd': random.uniform(10, 60),
-            'mttr': random.uniform(30, 120),
-            'mttr_resolve': random.uniform(240, 720),
-            'security_score': random.randint(75, 95),
-        }
+
+        history = []
+        for period_index in range(periods - 1, -1, -1):
+            period_start, period_end = self._get_period_dates(days, period_index)
+            history.append({
+                'period_index': period_index,
+                'start_date': period_start,
+                'end_date': period_end,
+                'mttd': random.uniform(10, 60),
+                'mttr': random.uniform(30, 120),
+                'mttr_resolve': random.uniform(240, 720),
+                'security_score': random.randint(75, 95),
+            })
+
+        return {'current': history[-1], 'previous': history[-2], 'periods': history}
 
 # Create singleton instance
 bigquery_service = BigQueryService()
+metrics_registry.register_collector(bigquery_service.collect_metrics)
@@ -0,0 +1,121 @@
+"""
+Circuit breaker around warehouse queries
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+fail immediately with CircuitOpenError instead of waiting out another
+timeout. Once `reset_seconds` have passed, a single half-open probe is let
+through: success closes the circuit, failure re-opens it for another
+`reset_seconds`.
+"""
+import threading
+import time
+from typing import Dict
+
+from .metrics import metrics_registry
+
+CIRCUIT_TRANSITIONS = metrics_registry.counter(
+    "dashboard_circuit_transitions_total", "Warehouse circuit breaker state changes", ["state"]
+)
+CIRCUIT_REJECTIONS = metrics_registry.counter(
+    "dashboard_circuit_rejections_total", "Warehouse queries failed fast by the open circuit"
+)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of running a query while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe consecutive-failure circuit breaker
+
+    Queries run on worker threads, so state changes are guarded by a lock.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Seconds the circuit stays open before a half-open probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == CLOSED
+
+    def before_call(self) -> None:
+        """
+        Admit a call or fail fast
+
+        Raises:
+            CircuitOpenError: The circuit is open, or half-open with a probe
+                already in flight
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._transition(HALF_OPEN)
+
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+
+        CIRCUIT_REJECTIONS.inc()
+        raise CircuitOpenError("Warehouse circuit is open; failing fast")
+
+    def record_success(self) -> None:
+        """Reset the failure count, closing the circuit after a successful probe"""
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold or after a failed probe"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def stats(self) -> Dict:
+        """Return the state and consecutive failure count"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_seconds': self.reset_seconds,
+            }
+
+    def _transition(self, state: str) -> None:
+        """Change state (caller holds the lock)"""
+        if state != self._state:
+            print(f"Warehouse circuit {self._state} -> {state}")
+            self._state = state
+            CIRCUIT_TRANSITIONS.inc(state=state)
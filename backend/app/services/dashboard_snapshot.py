@@ -0,0 +1,49 @@
+"""
+Serialized dashboard snapshots with content-derived ETags
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+
+class DashboardSnapshot:
+    """Serialized dashboard response body, its ETag and whether it was built from stale data"""
+
+    __slots__ = ("etag", "body", "stale")
+
+    def __init__(self, etag: str, body: bytes, stale: bool = False):
+        self.etag = etag
+        self.body = body
+        self.stale = stale
+
+
+def compute_etag(raw_data: Any, variant: Any = None) -> str:
+    """
+    Derive a strong ETag from the warehouse data behind a dashboard
+
+    The hash covers the fetched data rather than the rendered response, whose
+    generated_at timestamp changes on every build even when nothing else does.
+
+    Args:
+        raw_data: Data the response is rendered from
+        variant: How the response renders it (e.g. sections and layout), so
+            different representations of the same data get different ETags
+    """
+    if variant is not None:
+        raw_data = {'variant': variant, 'data': raw_data}
+    canonical = json.dumps(raw_data, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header value matches `etag` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
@@ -1,11 +1,13 @@
 """
 Data transformation service for Executive Dashboard
 """
-from typing import Dict, List
+from typing import Dict, FrozenSet, Iterable, List, Tuple
 from datetime import datetime
+from functools import lru_cache
 from ..models.executive_metrics import (
     ExecutiveMetrics,
     MetricsComparison,
+    PeriodMetrics,
     TrendDataPoint,
     SeverityData,
     RiskItem,
@@ -13,6 +15,29 @@ from ..models.executive_metrics import (
     ExecutiveDashboardResponse
 )
 
+# Response sections and the get_dashboard_data datasets each is derived from
+SECTION_DATASETS = {
+    'metrics': ('incident_data', 'agent_data'),
+    'trend_data': ('trend_data',),
+    'severity_data': ('severity_data',),
+    'risks': (),
+    'compliance': (),
+}
+
+DASHBOARD_SECTIONS = tuple(SECTION_DATASETS)
+
+# Sections that can be sent column-wise, with their columns in order
+COLUMNAR_SECTIONS = {
+    'trend_data': ('date', 'timestamp', 'incidents'),
+    'severity_data': ('name', 'value', 'color'),
+}
+
+
+def datasets_for_sections(sections: Iterable[str]) -> FrozenSet[str]:
+    """Return the get_dashboard_data datasets needed to build the given response sections"""
+    return frozenset(dataset for section in sections for dataset in SECTION_DATASETS[section])
+
+
 class DataTransformer:
     """Transform BigQuery data to Executive Dashboard format"""
 
@@ -25,44 +50,87 @@ class DataTransformer:
         Transform incident and agent data to executive metrics format
 
         Args:
-            incident_data: Current and previous incident metrics
-            agent_data: Agent performance metrics
+            incident_data: Current, previous and historical incident metrics
+            agent_data: Current, previous and historical agent performance metrics
 
         Returns:
-            MetricsComparison with current and previous periods
+            MetricsComparison with current and previous periods and history
         """
+        current_fields, previous_fields = DataTransformer._executive_metrics_fields(incident_data, agent_data)
+
+        current = ExecutiveMetrics(**current_fields)
+        previous = ExecutiveMetrics(**previous_fields)
+
+        # Build multi-period incident and agent history
+        history = [
+            PeriodMetrics(**period)
+            for period in DataTransformer._history_periods(incident_data, agent_data)
+        ]
+
+        return MetricsComparison(current=current, previous=previous, history=history)
+
+    @staticmethod
+    def _executive_metrics_fields(incident_data: Dict, agent_data: Dict) -> Tuple[Dict, Dict]:
+        """Derive current and previous ExecutiveMetrics fields, applying defaults"""
         current_incidents = incident_data.get('current', {})
         previous_incidents = incident_data.get('previous', {})
+        current_agent = agent_data.get('current', {})
+        previous_agent = agent_data.get('previous', {})
 
-        # Build current period metrics
-        current = ExecutiveMetrics(
-            total_incidents=current_incidents.get('total_incidents', 0),
-            critical_incidents=current_incidents.get('critical_incidents', 0),
-            avg_response_time=current_incidents.get('avg_response_time', 30.0),
-            resolved_rate=current_incidents.get('resolved_rate', 90.0),
-            false_positive_rate=current_incidents.get('false_positive_rate', 5.0),
-            security_score=agent_data.get('security_score', 85),
-            compliance_score=92,  # TODO: Get from compliance table if available
-            mttr=agent_data.get('mttr', 45.0),
-            mttd=agent_data.get('mttd', 25.0),
-            mttr_resolve=agent_data.get('mttr_resolve', 360.0)
-        )
+        # Current period metrics
+        current = {
+            'total_incidents': int(current_incidents.get('total_incidents', 0)),
+            'critical_incidents': int(current_incidents.get('critical_incidents', 0)),
+            'avg_response_time': float(current_incidents.get('avg_response_time', 30.0)),
+            'resolved_rate': float(current_incidents.get('resolved_rate', 90.0)),
+            'false_positive_rate': float(current_incidents.get('false_positive_rate', 5.0)),
+            'security_score': int(current_agent.get('security_score', 85)),
+            'compliance_score': 92,  # TODO: Get from compliance table if available
+            'mttr': float(current_agent.get('mttr', 45.0)),
+            'mttd': float(current_agent.get('mttd', 25.0)),
+            'mttr_resolve': float(current_agent.get('mttr_resolve', 360.0)),
+            'response_time_p50': current_incidents.get('response_time_p50'),
+            'response_time_p90': current_incidents.get('response_time_p90'),
+            'response_time_p99': current_incidents.get('response_time_p99'),
+            'unique_source_ips': current_incidents.get('unique_source_ips'),
+            'unique_assets': current_incidents.get('unique_assets')
+        }
 
-        # Build previous period metrics
-        previous = ExecutiveMetrics(
-            total_incidents=previous_incidents.get('total_incidents', 0),
-            critical_incidents=previous_incidents.get('critical_incidents', 0),
-            avg_response_time=previous_incidents.get('avg_response_time', 30.0),
-            resolved_rate=previous_incidents.get('resolved_rate', 90.0),
-            false_positive_rate=previous_incidents.get('false_positive_rate', 5.0),
-            security_score=int(agent_data.get('security_score', 85) * 0.95),
-            compliance_score=90,
-            mttr=agent_data.get('mttr', 45.0) * 1.1,
-            mttd=agent_data.get('mttd', 25.0) * 1.05,
-            mttr_resolve=agent_data.get('mttr_resolve', 360.0) * 1.08
-        )
+        # Previous period metrics
+        previous = {
+            'total_incidents': int(previous_incidents.get('total_incidents', 0)),
+            'critical_incidents': int(previous_incidents.get('critical_incidents', 0)),
+            'avg_response_time': float(previous_incidents.get('avg_response_time', 30.0)),
+            'resolved_rate': float(previous_incidents.get('resolved_rate', 90.0)),
+            'false_positive_rate': float(previous_incidents.get('false_positive_rate', 5.0)),
+            'security_score': int(previous_agent.get('security_score', 85)),
+            'compliance_score': 90,
+            'mttr': float(previous_agent.get('mttr', 45.0)),
+            'mttd': float(previous_agent.get('mttd', 25.0)),
+            'mttr_resolve': float(previous_agent.get('mttr_resolve', 360.0)),
+            'response_time_p50': previous_incidents.get('response_time_p50'),
+            'response_time_p90': previous_incidents.get('response_time_p90'),
+            'response_time_p99': previous_incidents.get('response_time_p99'),
+            'unique_source_ips': previous_incidents.get('unique_source_ips'),
+            'unique_assets': previous_incidents.get('unique_assets')
+        }
+
+        return current, previous
 
-        return MetricsComparison(current=current, previous=previous)
+    @staticmethod
+    def _history_periods(incident_data: Dict, agent_data: Dict) -> List[Dict]:
+        """Merge each incident history period with the agent metrics of the same period"""
+        agent_periods = {period['period_index']: period for period in agent_data.get('periods', [])}
+        return [
+            {
+                **period,
+                **{
+                    field: agent_periods.get(period['period_index'], {}).get(field)
+                    for field in AGENT_PERIOD_FIELDS
+                }
+            }
+            for period in incident_data.get('periods', [])
+        ]
 
     @staticmethod
     def transform_trend_data(trend_data: List[Dict]) -> List[TrendDataPoint]:
@@ -70,13 +138,13 @@ class DataTransformer:
         Transform trend data to dashboard format
 
         Args:
-            trend_data: List of daily incident counts
+            trend_data: List of incident counts per bucket
 
         Returns:
             List of TrendDataPoint objects
         """
         return [
-            TrendDataPoint(date=item['date'], incidents=item['incidents'])
+            TrendDataPoint(date=item['date'], timestamp=item.get('timestamp'), incidents=item['incidents'])
             for item in trend_data
         ]
 
@@ -159,6 +227,80 @@ class DataTransformer:
             ComplianceFramework(name="HIPAA", score=92)
         ]
 
+    @staticmethod
+    def build_dashboard_payload(raw_data: Dict, sections: Iterable[str] = DASHBOARD_SECTIONS) -> Dict:
+        """
+        Build the dashboard response as plain JSON-ready data (trusted fast path)
+
+        Produces the same structure as ExecutiveDashboardResponse.model_dump(mode='json')
+        without constructing or validating pydantic models. Only for data
+        BigQueryService produced itself, whose types are already normalized.
+
+        Args:
+            raw_data: Result of bigquery_service.get_dashboard_data, holding
+                at least the datasets the requested sections need
+            sections: Response sections to build (default: all)
+
+        Returns:
+            Dictionary with the requested sections and generated_at
+        """
+        payload = {}
+
+        if 'metrics' in sections:
+            current, previous = DataTransformer._executive_metrics_fields(
+                raw_data['incident_data'],
+                raw_data['agent_data']
+            )
+            payload['metrics'] = {
+                'current': current,
+                'previous': previous,
+                'history': [
+                    {field: period[field] for field in PERIOD_FIELDS}
+                    for period in DataTransformer._history_periods(raw_data['incident_data'], raw_data['agent_data'])
+                ]
+            }
+        if 'trend_data' in sections:
+            payload['trend_data'] = [
+                {'date': item['date'], 'timestamp': item.get('timestamp'), 'incidents': item['incidents']}
+                for item in raw_data['trend_data']
+            ]
+        if 'severity_data' in sections:
+            payload['severity_data'] = [
+                {'name': item['name'], 'value': item['value'], 'color': item['color']}
+                for item in raw_data['severity_data']
+            ]
+        payload.update(DataTransformer.static_sections(sections))
+
+        payload['generated_at'] = datetime.now().isoformat()
+        return payload
+
+    @staticmethod
+    def to_columnar(payload: Dict) -> Dict:
+        """
+        Return `payload` with its time-series sections as parallel arrays
+
+        Each COLUMNAR_SECTIONS list of points becomes one array per field,
+        e.g. trend_data {"date": [...], "timestamp": [...], "incidents": [...]},
+        so field names are sent once instead of once per point.
+        """
+        columnar = dict(payload)
+        for section, columns in COLUMNAR_SECTIONS.items():
+            if section in columnar:
+                rows = columnar[section]
+                columnar[section] = {column: [row.get(column) for row in rows] for column in columns}
+        return columnar
+
+    @staticmethod
+    def static_sections(sections: Iterable[str] = DASHBOARD_SECTIONS) -> Dict[str, List[Dict]]:
+        """Return the requested static sections (risks, compliance) as plain data"""
+        risks, compliance = _static_payload()
+        static = {}
+        if 'risks' in sections:
+            static['risks'] = risks
+        if 'compliance' in sections:
+            static['compliance'] = compliance
+        return static
+
     @staticmethod
     def build_dashboard_response(
         metrics: MetricsComparison,
@@ -189,5 +331,18 @@ class DataTransformer:
             generated_at=datetime.now()
         )
 
+PERIOD_FIELDS = tuple(PeriodMetrics.model_fields)
+# History fields that come from the agent metrics of the same period
+AGENT_PERIOD_FIELDS = ('security_score', 'mttr', 'mttd', 'mttr_resolve')
+
+
+@lru_cache(maxsize=1)
+def _static_payload() -> Tuple[List[Dict], List[Dict]]:
+    """Static risks and compliance scores as plain data, built once"""
+    return (
+        [risk.model_dump() for risk in DataTransformer.get_static_risks()],
+        [framework.model_dump() for framework in DataTransformer.get_static_compliance()]
+    )
+
 # Create singleton instance
 data_transformer = DataTransformer()
@@ -0,0 +1,56 @@
+"""
+Per-request deadline budget for warehouse queries
+
+An endpoint creates a Deadline and hands it to BigQueryService, which waits
+for each dataset only as long as the budget left, so a slow warehouse cannot
+hold a request past its deadline. The queries themselves are shared with
+other requests and are bounded by QUERY_TIMEOUT_SECONDS only. Datasets that
+miss the deadline are recorded so the response can be marked stale.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Set
+
+
+class Deadline:
+    """Absolute point in time a request must finish its warehouse work by"""
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: Budget from now
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.missed: Set[str] = set()
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def miss(self, name: str) -> None:
+        """Record that `name` was not fetched in time and was filled from cache or fallback"""
+        self.missed.add(name)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar('deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline bound to the running context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def bind_deadline(deadline: Optional[Deadline]) -> Iterator[None]:
+    """Bind `deadline` for the cached loads awaited inside the block, which record their misses on it"""
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
@@ -0,0 +1,59 @@
+"""
+HyperLogLog sketches for approximate distinct counts
+
+Each value is hashed to 64 bits (FARM_FINGERPRINT): the low PRECISION bits
+pick one of REGISTERS registers, and each register keeps the largest rank
+(position of the first 1 bit) seen in the next RANK_BITS bits. The harmonic
+mean of 2^-rank over the registers estimates the number of distinct values
+with a relative standard error of 1.04 / sqrt(REGISTERS), about 1.6%, so
+about 95% of estimates are within 3.3% of the exact count. Sketches merge
+exactly by keeping each register's maximum rank, which lets the rollup store
+one sketch per day and any window's count come from merging its days.
+
+Registers are computed and merged in SQL (register_sql, rank_sql); sketches
+are stored as sparse 'register:rank,...' text holding only non-empty
+registers, and only two statistics per merged sketch leave the warehouse.
+"""
+import math
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+RANK_BITS = 31
+STANDARD_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def register_sql(hash_sql: str) -> str:
+    """Return BigQuery SQL computing the register a 64-bit hash falls in"""
+    return f"({hash_sql} & {REGISTERS - 1})"
+
+
+def rank_sql(hash_sql: str) -> str:
+    """
+    Return BigQuery SQL computing a 64-bit hash's rank: 1 + the leading zeros
+    of the RANK_BITS bits above the register bits (RANK_BITS + 1 if all zero)
+    """
+    bits = f"(({hash_sql} >> {PRECISION}) & {(1 << RANK_BITS) - 1})"
+    # floor(log2(bits)) is exact for integers once offset by 0.5; 0 gives -1
+    return f"{RANK_BITS} - CAST(FLOOR(LOG({bits} + 0.5, 2)) AS INT64)"
+
+
+def estimate_count(registers: int, harmonic: float) -> int:
+    """
+    Estimate a distinct count from a merged sketch's register statistics
+
+    Args:
+        registers: Number of non-empty registers
+        harmonic: Sum of 2^-rank over the non-empty registers
+
+    Returns:
+        Estimated number of distinct values
+    """
+    empty = REGISTERS - registers
+    raw = _ALPHA * REGISTERS * REGISTERS / (harmonic + empty)
+
+    # Small cardinalities: linear counting over the empty registers is more accurate
+    if raw <= 2.5 * REGISTERS and empty:
+        return round(REGISTERS * math.log(REGISTERS / empty))
+    return round(raw)
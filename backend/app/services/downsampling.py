@@ -0,0 +1,63 @@
+"""
+Shape-preserving downsampling for time series
+
+Largest-Triangle-Three-Buckets (LTTB) splits a series into as many buckets as
+points wanted and keeps, from each bucket, the point forming the largest
+triangle with the previously kept point and the average of the next bucket.
+Unlike averaging or striding, spikes survive because the point kept is always
+an original one, and outliers make the largest triangles.
+"""
+from typing import List, Sequence
+
+
+def lttb_indices(values: Sequence[float], max_points: int) -> List[int]:
+    """
+    Return the indices of the points LTTB keeps, in order
+
+    Points are taken as evenly spaced on the x axis. The first and last
+    points are always kept.
+
+    Args:
+        values: y values of the series
+        max_points: Number of points to keep (series this short or shorter,
+            or a budget below 3, are returned whole)
+    """
+    n = len(values)
+    if max_points >= n or max_points < 3:
+        return list(range(n))
+
+    every = (n - 2) / (max_points - 2)
+    kept = [0]
+    a = 0
+
+    # Bucket boundaries, computed once so float rounding can't skip or overlap points;
+    # the last "bucket" is the final point alone
+    bounds = [int(i * every) + 1 for i in range(max_points - 2)] + [n - 1, n]
+
+    for i in range(max_points - 2):
+        # Average of the next bucket, the third corner of the triangle
+        next_start, next_end = bounds[i + 1], bounds[i + 2]
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        # Point of this bucket making the largest triangle with a and the average
+        start, end = bounds[i], bounds[i + 1]
+        ay = values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((a - avg_x) * (values[j] - ay) - (a - j) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        kept.append(best)
+        a = best
+
+    kept.append(n - 1)
+    return kept
+
+
+def downsample(points: List[dict], key: str, max_points: int) -> List[dict]:
+    """Keep at most `max_points` of `points` by LTTB on `key`"""
+    if len(points) <= max_points:
+        return points
+    return [points[i] for i in lttb_indices([point[key] for point in points], max_points)]
@@ -0,0 +1,31 @@
+"""
+Fast JSON encoding for response bodies and stream events
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise; both produce compact UTF-8 bytes.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode types neither encoder handles natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize `data` to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
@@ -0,0 +1,191 @@
+"""
+Push-based live dashboard updates over Server-Sent Events
+
+One refresh loop runs per (days, periods) window, shared by every connected
+viewer of that window. Each refresh is diffed against the previous one and
+only the sections that changed are encoded (once) and fanned out to all
+subscribers, so warehouse load scales with the refresh rate rather than the
+number of open dashboards.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .json_encoder import dumps
+from .metrics import metrics_registry
+
+LIVE_REFRESHES = metrics_registry.counter(
+    "dashboard_live_refreshes_total", "Live dashboard refreshes by outcome", ["status"]
+)
+LIVE_EVENTS = metrics_registry.counter(
+    "dashboard_live_events_total", "Live dashboard events published, before fan-out", ["event"]
+)
+
+# Builds the dashboard for a (days, periods) window as JSON-ready data
+DashboardBuilder = Callable[[int, int], Awaitable[Dict[str, Any]]]
+
+ChannelKey = Tuple[int, int]
+
+
+def encode_event(event: str, data: Any) -> bytes:
+    """Encode one Server-Sent Event"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """One connected viewer: a bounded queue of encoded events"""
+
+    def __init__(self, max_pending: int):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=max_pending)
+
+    def push(self, event: bytes, snapshot: Callable[[], bytes]) -> None:
+        """
+        Queue an event; a viewer that has fallen too far behind gets its
+        backlog replaced by a full snapshot instead of blocking the fan-out
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(snapshot())
+
+
+class LiveChannel:
+    """Shared refresh loop and last-known state for one dashboard window"""
+
+    def __init__(self, key: ChannelKey, builder: DashboardBuilder, refresh_seconds: float):
+        self.key = key
+        self.builder = builder
+        self.refresh_seconds = refresh_seconds
+        self.subscribers: Set[Subscriber] = set()
+        self.state: Optional[Dict[str, Any]] = None
+        self._snapshot_event: Optional[bytes] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Add a viewer, sending the current snapshot and starting the loop if needed"""
+        self.subscribers.add(subscriber)
+        if self.state is not None:
+            subscriber.push(self.snapshot_event(), self.snapshot_event)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a viewer, stopping the loop once nobody is watching"""
+        self.subscribers.discard(subscriber)
+        if not self.subscribers:
+            self.stop()
+
+    def stop(self) -> None:
+        """Cancel the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot_event(self) -> bytes:
+        """Full current state as a 'snapshot' event (encoded once per change)"""
+        if self._snapshot_event is None:
+            self._snapshot_event = encode_event('snapshot', self.state)
+        return self._snapshot_event
+
+    async def _run(self) -> None:
+        days, periods = self.key
+        while self.subscribers:
+            try:
+                self._apply(await self.builder(days, periods))
+                LIVE_REFRESHES.inc(status='ok')
+            except Exception as e:
+                LIVE_REFRESHES.inc(status='error')
+                print(f"Error refreshing live dashboard for {days} days: {e}")
+
+            await asyncio.sleep(self.refresh_seconds)
+
+    def _apply(self, dashboard: Dict[str, Any]) -> None:
+        """Diff a freshly built dashboard against the last state and publish changes"""
+        previous, self.state = self.state, dashboard
+        self._snapshot_event = None
+
+        if previous is None:
+            self._publish('snapshot', self.snapshot_event())
+            return
+
+        for section in ('metrics', 'severity_data'):
+            if dashboard[section] != previous[section]:
+                self._publish(section, encode_event(section, dashboard[section]))
+
+        trend_update = self._trend_tail(previous['trend_data'], dashboard['trend_data'])
+        if trend_update is not None:
+            self._publish('trend_data', encode_event('trend_data', trend_update))
+
+    @staticmethod
+    def _trend_tail(old: List[Dict], new: List[Dict]) -> Optional[Dict[str, Any]]:
+        """
+        Describe a trend change as the window bounds plus new or changed points
+
+        Clients drop points outside [start, end] and upsert `points` by date.
+        """
+        old_by_date = {point['date']: point for point in old}
+        changed = [point for point in new if old_by_date.get(point['date']) != point]
+
+        if not changed and len(old) == len(new):
+            return None
+        return {
+            'start': new[0]['date'] if new else None,
+            'end': new[-1]['date'] if new else None,
+            'points': changed
+        }
+
+    def _publish(self, name: str, event: bytes) -> None:
+        LIVE_EVENTS.inc(event=name)
+        for subscriber in list(self.subscribers):
+            subscriber.push(event, self.snapshot_event)
+
+
+class DashboardBroadcaster:
+    """Registry of live channels, one per dashboard window with viewers"""
+
+    def __init__(self, builder: DashboardBuilder, refresh_seconds: float = 30, max_pending: int = 16):
+        """
+        Args:
+            builder: Coroutine function building the dashboard for (days, periods)
+            refresh_seconds: Delay between refreshes of each watched window
+            max_pending: Events buffered per viewer before it is resynced with a snapshot
+        """
+        self.builder = builder
+        self.refresh_seconds = refresh_seconds
+        self.max_pending = max_pending
+        self.channels: Dict[ChannelKey, LiveChannel] = {}
+
+    def subscribe(self, days: int, periods: int) -> Tuple[LiveChannel, Subscriber]:
+        """Join the channel for a window, creating it on first use"""
+        key = (days, periods)
+        channel = self.channels.get(key)
+        if channel is None:
+            channel = self.channels[key] = LiveChannel(key, self.builder, self.refresh_seconds)
+
+        subscriber = Subscriber(self.max_pending)
+        channel.subscribe(subscriber)
+        return channel, subscriber
+
+    def unsubscribe(self, channel: LiveChannel, subscriber: Subscriber) -> None:
+        """Leave a channel, dropping it once empty"""
+        channel.unsubscribe(subscriber)
+        if not channel.subscribers:
+            self.channels.pop(channel.key, None)
+
+    def close(self) -> None:
+        """Stop every refresh loop"""
+        for channel in self.channels.values():
+            channel.stop()
+        self.channels.clear()
+
+    def collect_metrics(self):
+        """Report channel and subscriber counts for /metrics"""
+        channels = list(self.channels.values())
+        yield ("dashboard_live_channels", "gauge", "Dashboard windows with an active refresh loop", [({}, len(channels))])
+        yield (
+            "dashboard_live_subscribers",
+            "gauge",
+            "Connected live dashboard viewers",
+            [({}, sum(len(channel.subscribers) for channel in channels))]
+        )
@@ -0,0 +1,253 @@
+"""
+Embedded local warehouse backed by DuckDB
+
+Runs the same BigQuery-dialect queries as production over a local DuckDB
+file by translating them with sqlglot, which gives an offline, reproducible
+performance baseline and a fast development loop. Create and seed a file with:
+
+    python -m app.services.local_warehouse --days 400 --incidents-per-day 300
+"""
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from .warehouse import Warehouse
+
+# sqlglot warns about BigQuery-only DDL properties (PARTITION BY, CLUSTER BY) it drops
+logging.getLogger("sqlglot").setLevel(logging.ERROR)
+
+SEVERITY_WEIGHTS = {'CRITICAL': 0.08, 'HIGH': 0.22, 'MEDIUM': 0.40, 'LOW': 0.30}
+STATUS_WEIGHTS = {'RESOLVED': 0.80, 'IN_PROGRESS': 0.12, 'OPEN': 0.08}
+
+# Seeded attack sources: a few persistent attackers among a long tail of scanners
+PERSISTENT_ATTACKERS = 200
+SCANNER_POOL = 50000
+ASSETS = 1500
+
+
+@lru_cache(maxsize=1024)
+def translate_query(query: str) -> str:
+    """
+    Translate a BigQuery-dialect query to DuckDB SQL
+
+    Fully qualified `project.dataset.table` names are reduced to the bare
+    table name, since the local file holds a single dataset.
+    """
+    import sqlglot
+    from sqlglot import exp
+
+    def strip_qualifiers(node):
+        if isinstance(node, exp.Table):
+            node.set('catalog', None)
+            node.set('db', None)
+        return node
+
+    return sqlglot.parse_one(query, read='bigquery').transform(strip_qualifiers).sql(dialect='duckdb')
+
+
+class LocalWarehouse(Warehouse):
+    """DuckDB warehouse over a local file"""
+
+    def __init__(self, path: str, project_id: str = 'local', dataset_id: str = 'main'):
+        """
+        Args:
+            path: DuckDB database file (created if missing), or ':memory:'
+            project_id: Project name used when building queries
+            dataset_id: Dataset name used when building queries
+        """
+        import duckdb
+
+        self.path = path
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.connection = duckdb.connect(path)
+        # BigQuery semantics: naive TIMESTAMP literals and DATE(timestamp) are UTC.
+        # GLOBAL so the per-call cursors (separate sessions) use it too
+        self.connection.execute("SET GLOBAL TimeZone = 'UTC'")
+        self.create_schema()
+
+    def execute(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        job_stats: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run a translated query on a per-call cursor (safe across threads), interrupting it on timeout"""
+        import duckdb
+
+        if job_stats is not None:
+            # Embedded engine: no job queue, scan accounting or result cache
+            job_stats.update({'queue_seconds': 0.0, 'bytes_processed': None, 'cache_hit': False})
+
+        cursor = self.connection.cursor()
+        timer = threading.Timer(timeout, cursor.interrupt) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            try:
+                result = cursor.execute(translate_query(query))
+            except duckdb.InterruptException:
+                raise TimeoutError(f"Local query did not finish within {timeout:.2f}s")
+
+            if result_format == 'arrow':
+                return result.fetch_arrow_table().to_batches()
+
+            if result_format == 'dataframe':
+                return result.df()
+
+            names = [column[0] for column in result.description]
+            rows = [dict(zip(names, values)) for values in result.fetchall()]
+
+            if result_format == 'scalar':
+                return rows[0] if rows else {}
+            return rows
+        finally:
+            if timer is not None:
+                timer.cancel()
+            cursor.close()
+
+    def execute_dml(self, statement: str) -> int:
+        """Run a translated DDL/DML statement"""
+        cursor = self.connection.cursor()
+        try:
+            row = cursor.execute(translate_query(statement)).fetchone()
+            return int(row[0]) if row else 0
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        """Close the DuckDB connection"""
+        self.connection.close()
+
+    def create_schema(self) -> None:
+        """
+        Create the activity_logs and agent_metrics tables if they don't exist,
+        and define the BigQuery functions DuckDB lacks
+        """
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS activity_logs (
+            timestamp TIMESTAMPTZ,
+            severity VARCHAR,
+            status VARCHAR,
+            detection_time TIMESTAMPTZ,
+            response_time TIMESTAMPTZ,
+            is_false_positive BOOLEAN,
+            source_ip VARCHAR,
+            asset_name VARCHAR
+        )
+        """)
+        # Files created before these columns existed
+        self.connection.execute("ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS source_ip VARCHAR")
+        self.connection.execute("ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS asset_name VARCHAR")
+        # A signed 64-bit hash standing in for BigQuery's FARM_FINGERPRINT (values differ, distribution doesn't)
+        self.connection.execute("""
+        CREATE OR REPLACE MACRO farm_fingerprint(value) AS
+            CAST(CAST(hash(value) AS HUGEINT) - 9223372036854775808 AS BIGINT)
+        """)
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS agent_metrics (
+            timestamp TIMESTAMPTZ,
+            detection_time_minutes DOUBLE,
+            response_time_minutes DOUBLE,
+            resolution_time_minutes DOUBLE,
+            security_score INTEGER
+        )
+        """)
+
+    def seed(
+        self,
+        days: int = 400,
+        incidents_per_day: int = 300,
+        seed: int = 42,
+        end_date: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Replace table contents with deterministic synthetic data
+
+        Args:
+            days: Number of days of history ending at `end_date`
+            incidents_per_day: Average activity_logs rows per day
+            seed: Random seed; the same seed and end date give identical data
+            end_date: Last day of generated data (default: now)
+
+        Returns:
+            Number of rows written per table
+        """
+        import pyarrow as pa
+
+        rng = random.Random(seed)
+        # Separate stream, so adding these columns left the others' data unchanged
+        entity_rng = random.Random(seed + 1)
+        end = (end_date or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=days - 1)
+        severities, severity_weights = zip(*SEVERITY_WEIGHTS.items())
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+
+        activity = {name: [] for name in (
+            'timestamp', 'severity', 'status', 'detection_time', 'response_time', 'is_false_positive',
+            'source_ip', 'asset_name'
+        )}
+        for day in range(days):
+            day_start = start + timedelta(days=day)
+            for _ in range(max(0, int(rng.gauss(incidents_per_day, incidents_per_day * 0.2)))):
+                timestamp = day_start + timedelta(seconds=rng.randrange(86400))
+                detection_time = timestamp + timedelta(minutes=rng.expovariate(1 / 20))
+                responded = rng.random() < 0.95
+
+                activity['timestamp'].append(timestamp)
+                activity['severity'].append(rng.choices(severities, severity_weights)[0])
+                activity['status'].append(rng.choices(statuses, status_weights)[0])
+                activity['detection_time'].append(detection_time)
+                activity['response_time'].append(
+                    detection_time + timedelta(minutes=rng.lognormvariate(3.2, 0.8)) if responded else None
+                )
+                activity['is_false_positive'].append(rng.random() < 0.07)
+
+                if entity_rng.random() < 0.4:
+                    source = entity_rng.randrange(PERSISTENT_ATTACKERS)
+                else:
+                    source = PERSISTENT_ATTACKERS + entity_rng.randrange(SCANNER_POOL)
+                activity['source_ip'].append(f"203.{source >> 16}.{(source >> 8) & 255}.{source & 255}")
+                activity['asset_name'].append(f"asset-{entity_rng.randrange(ASSETS):04d}")
+
+        agent = {name: [] for name in (
+            'timestamp', 'detection_time_minutes', 'response_time_minutes',
+            'resolution_time_minutes', 'security_score'
+        )}
+        for hour in range(days * 24):
+            agent['timestamp'].append(start + timedelta(hours=hour))
+            agent['detection_time_minutes'].append(rng.uniform(5, 45))
+            agent['response_time_minutes'].append(rng.uniform(15, 90))
+            agent['resolution_time_minutes'].append(rng.uniform(120, 600))
+            agent['security_score'].append(rng.randint(70, 98))
+
+        activity_table = pa.table(activity)
+        agent_table = pa.table(agent)
+
+        self.connection.execute("DELETE FROM activity_logs")
+        self.connection.execute("INSERT INTO activity_logs SELECT * FROM activity_table")
+        self.connection.execute("DELETE FROM agent_metrics")
+        self.connection.execute("INSERT INTO agent_metrics SELECT * FROM agent_table")
+
+        return {'activity_logs': activity_table.num_rows, 'agent_metrics': agent_table.num_rows}
+
+
+if __name__ == "__main__":
+    import argparse
+    from ..config.settings import settings
+
+    parser = argparse.ArgumentParser(description="Create and seed a local DuckDB warehouse")
+    parser.add_argument("--path", default=settings.local_warehouse_path, help="DuckDB file to write")
+    parser.add_argument("--days", type=int, default=400, help="Days of history to generate")
+    parser.add_argument("--incidents-per-day", type=int, default=300, help="Average incidents per day")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    args = parser.parse_args()
+
+    warehouse = LocalWarehouse(args.path)
+    counts = warehouse.seed(days=args.days, incidents_per_day=args.incidents_per_day, seed=args.seed)
+    warehouse.close()
+    print(f"Seeded {args.path}: {counts}")
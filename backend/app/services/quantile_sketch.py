@@ -0,0 +1,97 @@
+"""
+Mergeable quantile sketches for response-time percentiles
+
+A QuantileSketch is a log-bucketed histogram (DDSketch): a value v >= 1 is
+counted in bucket ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a), so every
+quantile it returns is within relative accuracy `a` of the true value at that
+rank. Two sketches merge exactly by adding their bucket counts, which is what
+lets the rollup keep one small sketch per day and answer any window's
+percentiles by merging its days.
+
+Buckets are computed in SQL (see bucket_sql) so raw rows never leave the
+warehouse; sketches travel as 'bucket:count,bucket:count' text, and
+concatenating the text of several sketches gives the text of their merge.
+"""
+import math
+from typing import Dict, Optional
+
+# Changing this changes every bucket index: rebuild the rollup afterwards
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket_sql(value_sql: str) -> str:
+    """
+    Return BigQuery SQL computing the bucket index of `value_sql`
+
+    Values below 1 (e.g. sub-second response times) are counted as 1.
+    """
+    return f"CAST(CEIL(LN(GREATEST({value_sql}, 1)) / {LOG_GAMMA!r}) AS INT64)"
+
+
+class QuantileSketch:
+    """Log-bucketed histogram with relative-error quantiles and exact merges"""
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        """
+        Args:
+            counts: Initial count per bucket index
+        """
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    @classmethod
+    def parse(cls, text: Optional[str]) -> 'QuantileSketch':
+        """
+        Build a sketch from 'bucket:count,...' text (None or '' is empty)
+
+        Repeated buckets are summed, so the comma-joined text of several
+        sketches parses as their merge.
+        """
+        counts: Dict[int, int] = {}
+        if text:
+            for entry in text.split(','):
+                bucket, count = entry.split(':')
+                counts[int(bucket)] = counts.get(int(bucket), 0) + int(count)
+        return cls(counts)
+
+    def serialize(self) -> str:
+        """Return the sketch as 'bucket:count,...' text, buckets ascending"""
+        return ','.join(f"{bucket}:{count}" for bucket, count in sorted(self.counts.items()))
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count `value` (values below 1 are counted as 1)"""
+        bucket = math.ceil(math.log(max(value, 1)) / LOG_GAMMA)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Add `other`'s counts to this sketch and return it"""
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the `q`-quantile (0 <= q <= 1), or None if the sketch is empty
+
+        Returns:
+            A value within RELATIVE_ACCURACY of the true value at rank
+            q * (count - 1)
+        """
+        total = self.count
+        if not total:
+            return None
+
+        rank = q * (total - 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen > rank:
+                break
+
+        # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i]
+        return 2 * GAMMA ** bucket / (GAMMA + 1)
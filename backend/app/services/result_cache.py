@@ -0,0 +1,144 @@
+"""
+In-memory result cache with TTL, LRU eviction and stale-while-revalidate
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class CacheEntry:
+    """Cached value and the time it was stored"""
+
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class ResultCache:
+    """
+    Bounded async result cache
+
+    Fresh entries (younger than `ttl_seconds`) are served directly. When
+    stale-while-revalidate is enabled, expired entries keep being served for
+    up to `max_stale_seconds` while a single background task refreshes them.
+    Entries older than that, or missing entries, are loaded inline.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_entries: int = 256,
+        stale_while_revalidate: bool = True,
+        max_stale_seconds: float = 3600
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale_seconds = max_stale_seconds
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_failures': 0,
+            'evictions': 0,
+        }
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, loading it with `loader` if needed
+
+        Args:
+            key: Hashable cache key
+            loader: Zero-argument coroutine function producing the value
+
+        Returns:
+            Cached or freshly loaded value. Exceptions raised by an inline
+            load propagate to the caller and nothing is cached. A loader may
+            store its value itself (e.g. with its age, see set); it is then
+            not stored again as new.
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            age = now - entry.stored_at
+
+            if age < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return entry.value
+
+            if self.stale_while_revalidate and age < self.ttl_seconds + self.max_stale_seconds:
+                self._entries.move_to_end(key)
+                self._stats['stale_hits'] += 1
+                self._schedule_refresh(key, loader)
+                return entry.value
+
+        self._stats['misses'] += 1
+        value = await loader()
+        self._store_loaded(key, value)
+        return value
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key` regardless of age, or None"""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """
+        Store `value` under `key`, evicting least recently used entries
+
+        Args:
+            age: Seconds since the value was computed, e.g. when it was read
+                from another cache, so it expires when the original would
+        """
+        self._entries[key] = CacheEntry(value, time.monotonic() - age)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _store_loaded(self, key: Hashable, value: Any) -> None:
+        """Store a loader's result unless the loader already stored this very value"""
+        entry = self._entries.get(key)
+        if entry is None or entry.value is not value:
+            self.set(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry for `key`, if any"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/refresh counters and the current size"""
+        return {**self._stats, 'size': len(self._entries), 'max_entries': self.max_entries}
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Start a background refresh for `key` unless one is already running"""
+        if key in self._refreshing:
+            return
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(self._refresh(key, loader))
+
+    async def _refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        """Reload `key` in the background, keeping the stale value on failure"""
+        try:
+            value = await loader()
+            self._store_loaded(key, value)
+            self._stats['refreshes'] += 1
+        except Exception as e:
+            self._stats['refresh_failures'] += 1
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            self._refreshing.pop(key, None)
@@ -0,0 +1,463 @@
+"""
+Daily activity rollup: table definition, incremental maintenance and routed queries
+
+The rollup table holds one row per (date, severity) with the additive
+aggregates every dashboard KPI is derived from, so long windows read a few
+hundred pre-aggregated rows instead of scanning raw activity_logs. Each row
+also carries a mergeable response-time quantile sketch, from which any
+window's percentiles are computed by merging its days, and optionally
+HyperLogLog sketches for distinct counts, merged the same way.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from .distinct_sketch import rank_sql, register_sql
+from .quantile_sketch import bucket_sql
+
+# Additive per-day aggregates shared by the rollup table and its raw equivalent
+DAILY_AGGREGATE_COLUMNS = """
+            COUNT(*) as incidents,
+            COUNTIF(status = 'RESOLVED' OR status = 'Resolved') as resolved,
+            COUNTIF(is_false_positive = TRUE) as false_positives,
+            SUM(TIMESTAMP_DIFF(response_time, detection_time, MINUTE)) as response_time_sum,
+            COUNT(TIMESTAMP_DIFF(response_time, detection_time, MINUTE)) as response_time_count"""
+
+# Distinct counts kept as per-day HyperLogLog sketches: metric -> (activity_logs column, sketch column)
+DISTINCT_COUNTS = {
+    'unique_source_ips': ('source_ip', 'source_ip_sketch'),
+    'unique_assets': ('asset_name', 'asset_sketch'),
+}
+DISTINCT_SKETCH_COLUMNS = [sketch for _, sketch in DISTINCT_COUNTS.values()]
+
+# Columns the batch path folds in Python; distinct-count sketches are only merged in the warehouse
+DAILY_FOLD_COLUMNS = (
+    "date, severity, incidents, resolved, false_positives, "
+    "response_time_sum, response_time_count, response_time_sketch"
+)
+DAILY_COLUMNS = DAILY_FOLD_COLUMNS + ", " + ", ".join(DISTINCT_SKETCH_COLUMNS)
+
+# Joins the (bucket, response_time_count) rows of a `buckets` subquery into sketch text
+SKETCH_AGGREGATE = (
+    "STRING_AGG(CONCAT(CAST(buckets.bucket AS STRING), ':', "
+    "CAST(buckets.response_time_count AS STRING)), ',' ORDER BY buckets.bucket)"
+)
+
+
+def as_date(value: Any) -> Optional[date]:
+    """Normalize a DATE result (date, datetime or None) to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _table(project_id: str, dataset_id: str, table: str) -> str:
+    """Return a fully qualified, backtick-quoted table name"""
+    return f"`{project_id}.{dataset_id}.{table}`"
+
+
+def _daily_columns(distinct_counts: bool) -> str:
+    """Return DAILY_COLUMNS, with NULL distinct-count sketches unless `distinct_counts`"""
+    if distinct_counts:
+        return DAILY_COLUMNS
+    return DAILY_FOLD_COLUMNS + "".join(f", CAST(NULL AS STRING) as {sketch}" for sketch in DISTINCT_SKETCH_COLUMNS)
+
+
+def build_create_rollup_table_sql(project_id: str, dataset_id: str, rollup_table: str) -> str:
+    """Build DDL for the daily rollup table (partitioned by date, clustered by severity)"""
+    return f"""
+    CREATE TABLE IF NOT EXISTS {_table(project_id, dataset_id, rollup_table)} (
+        date DATE NOT NULL,
+        severity STRING,
+        incidents INT64,
+        resolved INT64,
+        false_positives INT64,
+        response_time_sum INT64,
+        response_time_count INT64,
+        response_time_sketch STRING,
+        source_ip_sketch STRING,
+        asset_sketch STRING,
+        updated_at TIMESTAMP
+    )
+    PARTITION BY date
+    CLUSTER BY severity
+    """
+
+
+def build_add_sketch_column_sql(project_id: str, dataset_id: str, rollup_table: str, column: str) -> str:
+    """Build DDL adding a sketch column to rollup tables created before it existed"""
+    return f"""
+    ALTER TABLE {_table(project_id, dataset_id, rollup_table)}
+    ADD COLUMN IF NOT EXISTS {column} STRING
+    """
+
+
+def build_raw_daily_aggregate_sql(
+    project_id: str,
+    dataset_id: str,
+    start_date: Optional[date],
+    end_date: date,
+    distinct_counts: bool = False
+) -> str:
+    """
+    Aggregate raw activity_logs rows to the rollup shape
+
+    One scan groups rows by (date, severity, response-time sketch bucket);
+    the outer query sums those groups per day and joins their bucket counts
+    into the day's sketch. With `distinct_counts`, one more scan per
+    DISTINCT_COUNTS column builds its per-day HyperLogLog sketch; otherwise
+    the distinct-count sketch columns are NULL.
+
+    Days without values get empty ('') sketches, so NULL always means "not
+    computed".
+
+    Args:
+        start_date: First day to include, or None for all history
+        end_date: First day to exclude
+        distinct_counts: Build the distinct-count sketches (activity_logs
+            must have the DISTINCT_COUNTS columns)
+    """
+    table = _table(project_id, dataset_id, 'activity_logs')
+    start_filter = f"timestamp >= TIMESTAMP('{start_date:%Y-%m-%d}')\n          AND " if start_date else ""
+    where = f"{start_filter}timestamp < TIMESTAMP('{end_date:%Y-%m-%d}')"
+
+    metrics = f"""
+        SELECT
+            buckets.date as date,
+            buckets.severity as severity,
+            SUM(buckets.incidents) as incidents,
+            SUM(buckets.resolved) as resolved,
+            SUM(buckets.false_positives) as false_positives,
+            SUM(buckets.response_time_sum) as response_time_sum,
+            SUM(buckets.response_time_count) as response_time_count,
+            COALESCE({SKETCH_AGGREGATE}, '') as response_time_sketch
+        FROM (
+            SELECT
+                DATE(timestamp) as date,
+                UPPER(severity) as severity,
+                {bucket_sql('TIMESTAMP_DIFF(response_time, detection_time, SECOND)')} as bucket,{DAILY_AGGREGATE_COLUMNS}
+            FROM {table}
+            WHERE {where}
+            GROUP BY date, severity, bucket
+        ) buckets
+        GROUP BY buckets.date, buckets.severity"""
+
+    if not distinct_counts:
+        return f"""
+        SELECT {_daily_columns(False)}
+        FROM ({metrics}
+        )"""
+
+    columns = "".join(f",\n            COALESCE({sketch}.sketch, '') as {sketch}" for sketch in DISTINCT_SKETCH_COLUMNS)
+    joins = "".join(
+        f"""
+        LEFT JOIN ({_build_distinct_sketch_sql(table, column, where)}
+        ) {sketch} ON {sketch}.date = daily_metrics.date
+            AND {sketch}.severity IS NOT DISTINCT FROM daily_metrics.severity"""
+        for column, sketch in DISTINCT_COUNTS.values()
+    )
+    return f"""
+        SELECT daily_metrics.*{columns}
+        FROM ({metrics}
+        ) daily_metrics{joins}"""
+
+
+def _build_distinct_sketch_sql(table: str, column: str, where: str) -> str:
+    """Build per-(date, severity) HyperLogLog sketch text of `column`, as `sketch`"""
+    return f"""
+            SELECT
+                registers.date as date,
+                registers.severity as severity,
+                STRING_AGG(CONCAT(CAST(registers.register AS STRING), ':', CAST(registers.register_rank AS STRING)),
+                           ',' ORDER BY registers.register) as sketch
+            FROM (
+                SELECT date, severity, {register_sql('hash')} as register, MAX({rank_sql('hash')}) as register_rank
+                FROM (
+                    SELECT DATE(timestamp) as date, UPPER(severity) as severity, FARM_FINGERPRINT(CAST({column} AS STRING)) as hash
+                    FROM {table}
+                    WHERE {where}
+                      AND {column} IS NOT NULL
+                )
+                GROUP BY date, severity, register
+            ) registers
+            GROUP BY registers.date, registers.severity"""
+
+
+def build_refresh_rollup_sql(
+    project_id: str,
+    dataset_id: str,
+    rollup_table: str,
+    start_date: Optional[date],
+    end_date: date,
+    distinct_counts: bool = False
+) -> str:
+    """
+    Build the incremental MERGE that brings [start_date, end_date) up to date
+
+    Only (date, severity) rows whose aggregates differ are rewritten, new
+    rows are inserted and rows that disappeared from the source are deleted,
+    so unchanged days cost no writes. Without `distinct_counts`, the
+    distinct-count sketch columns are left as they are.
+    """
+    source = build_raw_daily_aggregate_sql(project_id, dataset_id, start_date, end_date, distinct_counts)
+    start_filter = f"T.date >= DATE('{start_date:%Y-%m-%d}') AND " if start_date else ""
+    sketches = DISTINCT_SKETCH_COLUMNS if distinct_counts else []
+    changed = "".join(f"\n        OR T.{sketch} IS DISTINCT FROM S.{sketch}" for sketch in sketches)
+    updates = "".join(f"\n        {sketch} = S.{sketch}," for sketch in sketches)
+    insert_columns = "".join(f", {sketch}" for sketch in sketches)
+    insert_values = "".join(f" S.{sketch}," for sketch in sketches)
+
+    return f"""
+    MERGE {_table(project_id, dataset_id, rollup_table)} T
+    USING ({source}
+    ) S
+    ON T.date = S.date AND T.severity IS NOT DISTINCT FROM S.severity
+    WHEN MATCHED AND (
+        T.incidents != S.incidents
+        OR T.resolved != S.resolved
+        OR T.false_positives != S.false_positives
+        OR T.response_time_sum IS DISTINCT FROM S.response_time_sum
+        OR T.response_time_count != S.response_time_count
+        OR T.response_time_sketch IS DISTINCT FROM S.response_time_sketch{changed}
+    ) THEN UPDATE SET
+        incidents = S.incidents,
+        resolved = S.resolved,
+        false_positives = S.false_positives,
+        response_time_sum = S.response_time_sum,
+        response_time_count = S.response_time_count,
+        response_time_sketch = S.response_time_sketch,{updates}
+        updated_at = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED BY TARGET THEN INSERT ({DAILY_FOLD_COLUMNS}{insert_columns}, updated_at)
+        VALUES (S.date, S.severity, S.incidents, S.resolved, S.false_positives,
+                S.response_time_sum, S.response_time_count, S.response_time_sketch,{insert_values} CURRENT_TIMESTAMP())
+    WHEN NOT MATCHED BY SOURCE AND {start_filter}T.date < DATE('{end_date:%Y-%m-%d}') THEN DELETE
+    """
+
+
+def build_watermark_sql(project_id: str, dataset_id: str, rollup_table: str) -> str:
+    """Build a query returning the first date not covered by the rollup table"""
+    return f"""
+    SELECT DATE_ADD(MAX(date), INTERVAL 1 DAY) as watermark
+    FROM {_table(project_id, dataset_id, rollup_table)}
+    """
+
+
+def build_missing_sketch_sql(
+    project_id: str,
+    dataset_id: str,
+    rollup_table: str,
+    distinct_counts: bool = False
+) -> str:
+    """Build a query returning the first rolled-up date with a sketch not yet computed"""
+    columns = ['response_time_sketch'] + (DISTINCT_SKETCH_COLUMNS if distinct_counts else [])
+    missing = " OR ".join(f"{column} IS NULL" for column in columns)
+    return f"""
+    SELECT MIN(date) as first_missing
+    FROM {_table(project_id, dataset_id, rollup_table)}
+    WHERE {missing}
+    """
+
+
+def build_daily_source_sql(
+    project_id: str,
+    dataset_id: str,
+    rollup_table: str,
+    start_date: date,
+    end_date: date,
+    watermark: date,
+    distinct_counts: bool = False
+) -> str:
+    """
+    Build a `daily` CTE covering [start_date, end_date) in the rollup shape
+
+    Whole days before the watermark are read from the rollup table; only the
+    days from the watermark onwards (not yet rolled up) touch raw rows.
+    Distinct-count sketches are NULL unless `distinct_counts`.
+    """
+    parts = []
+    columns = _daily_columns(distinct_counts)
+
+    rollup_end = min(watermark, end_date)
+    if start_date < rollup_end:
+        parts.append(f"""
+        SELECT {columns}
+        FROM {_table(project_id, dataset_id, rollup_table)}
+        WHERE date >= DATE('{start_date:%Y-%m-%d}')
+          AND date < DATE('{rollup_end:%Y-%m-%d}')""")
+
+    raw_start = max(watermark, start_date)
+    if raw_start < end_date:
+        parts.append(build_raw_daily_aggregate_sql(project_id, dataset_id, raw_start, end_date, distinct_counts))
+
+    if not parts:
+        # Empty window: keep the CTE well-formed with no rows
+        parts.append(f"""
+        SELECT {columns}
+        FROM {_table(project_id, dataset_id, rollup_table)}
+        WHERE FALSE""")
+
+    return "WITH daily AS (" + "\n        UNION ALL".join(parts) + "\n        )"
+
+
+def build_merged_sketch_sql(group_sql: str, group_alias: str) -> str:
+    """
+    Build a query merging the `daily` CTE's response-time sketches per group
+
+    Sketch text is split into buckets whose counts are summed per (group,
+    bucket) and joined back into one sketch per group, so only the merged
+    sketches leave the warehouse.
+
+    Args:
+        group_sql: Expression over `daily` rows to group by
+        group_alias: Name of the group column in the result
+    """
+    return f"""
+            SELECT buckets.{group_alias} as {group_alias}, {SKETCH_AGGREGATE} as response_time_sketch
+            FROM (
+                SELECT
+                    {group_sql} as {group_alias},
+                    CAST(SPLIT(entry, ':')[OFFSET(0)] AS INT64) as bucket,
+                    SUM(CAST(SPLIT(entry, ':')[OFFSET(1)] AS INT64)) as response_time_count
+                FROM daily
+                CROSS JOIN UNNEST(SPLIT(response_time_sketch, ',')) AS entry
+                WHERE entry != ''
+                GROUP BY {group_alias}, bucket
+            ) buckets
+            GROUP BY buckets.{group_alias}"""
+
+
+def build_merged_distinct_sql(groups: Dict[str, str], source: str = "daily", where: str = "TRUE") -> str:
+    """
+    Build a query merging the `daily` CTE's HyperLogLog sketches per group
+
+    Registers are merged by keeping each one's maximum rank. Per group, each
+    DISTINCT_COUNTS metric gets `<metric>_registers` (non-empty registers)
+    and `<metric>_harmonic` (sum of 2^-rank over them), all that
+    distinct_sketch.estimate_count needs.
+
+    Args:
+        groups: Group column names to expressions over `source` rows
+        source: FROM clause providing `daily` rows (and any group inputs)
+        where: Filter on `source` rows
+    """
+    keys = ", ".join(groups)
+    group_columns = ", ".join(f"{sql} as {alias}" for alias, sql in groups.items())
+    registers = "\n                UNION ALL".join(
+        f"""
+                SELECT
+                    {group_columns},
+                    '{metric}' as metric,
+                    CAST(SPLIT(entry, ':')[OFFSET(0)] AS INT64) as register,
+                    MAX(CAST(SPLIT(entry, ':')[OFFSET(1)] AS INT64)) as register_rank
+                FROM {source}
+                CROSS JOIN UNNEST(SPLIT({sketch}, ',')) AS entry
+                WHERE {where} AND entry != ''
+                GROUP BY {keys}, metric, register"""
+        for metric, (_, sketch) in DISTINCT_COUNTS.items()
+    )
+    statistics = ",".join(
+        f"""
+                COUNTIF(registers.metric = '{metric}') as {metric}_registers,
+                SUM(IF(registers.metric = '{metric}', POW(2, -registers.register_rank), 0)) as {metric}_harmonic"""
+        for metric in DISTINCT_COUNTS
+    )
+    merged_keys = ", ".join(f"registers.{alias}" for alias in groups)
+    return f"""
+            SELECT {merged_keys},{statistics}
+            FROM ({registers}
+            ) registers
+            GROUP BY {merged_keys}"""
+
+
+class RollupJob:
+    """Incremental maintenance job for the daily rollup table"""
+
+    def __init__(self, service, rollup_table: str, lookback_days: int = 3, distinct_counts: bool = False):
+        """
+        Args:
+            service: BigQueryService whose warehouse and dataset are used
+            rollup_table: Name of the rollup table in the service's dataset
+            lookback_days: Already rolled-up days to re-check for late-arriving rows
+            distinct_counts: Maintain the distinct-count HyperLogLog sketches
+        """
+        self.service = service
+        self.rollup_table = rollup_table
+        self.lookback_days = lookback_days
+        self.distinct_counts = distinct_counts
+
+    def run(self) -> Dict:
+        """
+        Create the rollup table if needed and merge new or changed days
+
+        The first run backfills all history. Later runs re-check the last
+        `lookback_days` rolled-up days plus every day since, up to (but not
+        including) today, whose partial data is always read raw. Days rolled
+        up before a sketch was maintained (a column added later, or distinct
+        counts just enabled) are re-merged from the first of them.
+
+        Returns:
+            Summary with the refreshed range, rows changed and new watermark
+        """
+        project_id, dataset_id = self.service.project_id, self.service.dataset_id
+        warehouse = self.service.warehouse
+
+        warehouse.execute_dml(build_create_rollup_table_sql(project_id, dataset_id, self.rollup_table))
+        for column in ['response_time_sketch'] + DISTINCT_SKETCH_COLUMNS:
+            warehouse.execute_dml(build_add_sketch_column_sql(project_id, dataset_id, self.rollup_table, column))
+
+        watermark = self._read_watermark()
+        start_date = watermark - timedelta(days=self.lookback_days) if watermark else None
+
+        first_missing = self._read_date(
+            build_missing_sketch_sql(project_id, dataset_id, self.rollup_table, self.distinct_counts), 'first_missing'
+        )
+        if start_date and first_missing:
+            start_date = min(start_date, first_missing)
+        end_date = datetime.now().date()
+
+        rows_changed = warehouse.execute_dml(
+            build_refresh_rollup_sql(
+                project_id, dataset_id, self.rollup_table, start_date, end_date, self.distinct_counts
+            )
+        )
+
+        new_watermark = self._read_watermark()
+        self.service.rollup_watermark = new_watermark
+
+        return {
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat(),
+            'rows_changed': rows_changed,
+            'watermark': new_watermark.isoformat() if new_watermark else None
+        }
+
+    def _read_watermark(self) -> Optional[date]:
+        """Return the first date not covered by the rollup table, or None if empty"""
+        return self._read_date(
+            build_watermark_sql(self.service.project_id, self.service.dataset_id, self.rollup_table),
+            'watermark'
+        )
+
+    def _read_date(self, query: str, column: str) -> Optional[date]:
+        """Run a single-row query and return its `column` as a date"""
+        row = self.service.warehouse.execute(query, result_format='scalar')
+        return as_date(row.get(column))
+
+
+if __name__ == "__main__":
+    import argparse
+    from ..config.settings import settings
+    from .bigquery_service import bigquery_service
+
+    parser = argparse.ArgumentParser(description="Refresh the daily activity rollup table")
+    parser.add_argument(
+        "--lookback-days",
+        type=int,
+        default=settings.rollup_lookback_days,
+        help="Already rolled-up days to re-check for late-arriving rows"
+    )
+    args = parser.parse_args()
+
+    summary = RollupJob(
+        bigquery_service, settings.rollup_table, args.lookback_days, settings.distinct_counts_enabled
+    ).run()
+    print(f"Rollup refreshed: {summary}")
@@ -0,0 +1,49 @@
+"""
+Per-request timing breakdown reported through the Server-Timing header
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, List, Optional, Tuple
+
+
+class ServerTiming:
+    """
+    Collect named durations for one request
+
+    The header value follows the Server-Timing spec
+    (`name;dur=12.3;desc="..."`), which browser devtools show in the
+    request's Timing tab.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._entries: List[Tuple[str, float, Optional[str]]] = []
+
+    def add(self, name: str, duration_ms: float, description: Optional[str] = None) -> None:
+        """Record a duration in milliseconds"""
+        self._entries.append((name, duration_ms, description))
+
+    @contextmanager
+    def measure(self, name: str, description: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000, description)
+
+    async def measure_async(self, name: str, awaitable: Awaitable[Any], description: Optional[str] = None) -> Any:
+        """Await `awaitable` and record how long it took"""
+        with self.measure(name, description):
+            return await awaitable
+
+    def header_value(self) -> str:
+        """Render all entries plus the elapsed total as a Server-Timing header value"""
+        entries = self._entries + [('total', (time.perf_counter() - self._started) * 1000, None)]
+        parts = []
+        for name, duration_ms, description in entries:
+            part = f"{name};dur={duration_ms:.1f}"
+            if description:
+                part += f';desc="{description}"'
+            parts.append(part)
+        return ", ".join(parts)
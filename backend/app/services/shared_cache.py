@@ -0,0 +1,233 @@
+"""
+SQLite-backed result cache shared by every worker process on a host
+
+Each uvicorn/gunicorn worker keeps its own in-memory ResultCache; this tier
+sits behind it so a result loaded by one worker is reused by the others
+instead of each worker running its own BigQuery jobs. A short cross-process
+lease also coalesces concurrent misses: while one worker loads a key, the
+others poll for its result rather than starting the same query.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SharedResultCache:
+    """
+    Cross-process result cache stored in a local SQLite file
+
+    Values are pickled and keyed by a hash of the cache key. Entries younger
+    than `ttl_seconds` are served; older ones are purged on write, and the
+    oldest entries are evicted once the file holds more than `max_bytes` of
+    values. SQLite errors are logged and treated as misses, so a broken or
+    locked cache file never fails a request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 300,
+        max_bytes: int = 64 * 1024 * 1024,
+        lease_seconds: float = 30
+    ):
+        """
+        Args:
+            path: SQLite file shared by the workers
+            ttl_seconds: Seconds an entry is served as fresh
+            max_bytes: Total size of stored values before the oldest are evicted
+            lease_seconds: Longest a worker waits on another worker's load
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lease_seconds = lease_seconds
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'lease_waits': 0,
+            'errors': 0,
+        }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    @staticmethod
+    def hash_key(key: Hashable) -> str:
+        """Return the stable hash a cache key is stored under"""
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Return `(value, age_seconds)` for a fresh entry, or None
+
+        Args:
+            key: Cache key (hashed with hash_key)
+        """
+        try:
+            row = self._connection().execute(
+                "SELECT value, stored_at FROM entries WHERE key = ? AND stored_at > ?",
+                (self.hash_key(key), time.time() - self.ttl_seconds)
+            ).fetchone()
+            value = pickle.loads(row[0]) if row is not None else None
+        except Exception as e:
+            self._record_error('reading', key, e)
+            return None
+
+        if row is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return value, max(0.0, time.time() - row[1])
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key` and enforce the TTL and size limit"""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Store several `(key, value)` pairs in one transaction"""
+        now = time.time()
+
+        try:
+            rows = []
+            for key, value in items:
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                rows.append((self.hash_key(key), blob, len(blob), now))
+
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries (key, value, size, stored_at) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                connection.execute("DELETE FROM entries WHERE stored_at <= ?", (now - self.ttl_seconds,))
+                evicted = self._evict(connection)
+        except Exception as e:
+            self._record_error('writing', None, e)
+            return
+
+        self._count('writes', len(rows))
+        self._count('evictions', evicted)
+
+    def try_lease(self, key: Hashable) -> bool:
+        """
+        Claim the right to load `key` across processes
+
+        Returns:
+            True if this process holds the lease (or the cache is unusable),
+            False if another process is already loading `key`
+        """
+        now = time.time()
+
+        try:
+            connection = self._connection()
+            with connection:
+                cursor = connection.execute(
+                    """
+                    INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                    WHERE leases.expires_at <= ? OR leases.owner = excluded.owner
+                    """,
+                    (self.hash_key(key), os.getpid(), now + self.lease_seconds, now)
+                )
+            return cursor.rowcount > 0
+        except Exception as e:
+            self._record_error('leasing', key, e)
+            return True
+
+    def release(self, key: Hashable) -> None:
+        """Give up this process's lease on `key`"""
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "DELETE FROM leases WHERE key = ? AND owner = ?",
+                    (self.hash_key(key), os.getpid())
+                )
+        except Exception as e:
+            self._record_error('releasing', key, e)
+
+    def clear(self) -> None:
+        """Drop all entries and leases"""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM entries")
+            connection.execute("DELETE FROM leases")
+
+    def stats(self) -> Dict[str, int]:
+        """Return this process's hit/miss counters and the shared store's size"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        try:
+            size, total_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except Exception:
+            size, total_bytes = 0, 0
+
+        return {**stats, 'size': size, 'bytes': total_bytes, 'max_bytes': self.max_bytes}
+
+    def count_lease_wait(self) -> None:
+        """Record that a load waited on another process's lease"""
+        self._count('lease_waits')
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        """Delete the oldest entries until the stored values fit in max_bytes"""
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for key, size in connection.execute("SELECT key, size FROM entries ORDER BY stored_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        return evicted
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def _record_error(self, action: str, key: Optional[Hashable], error: Exception) -> None:
+        self._count('errors')
+        target = f" {key}" if key is not None else ""
+        print(f"Error {action} shared cache entry{target}: {error}")
@@ -0,0 +1,60 @@
+"""
+In-flight request coalescing (single-flight) for async computations
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key
+
+    The first caller for a key starts the computation; callers arriving
+    while it is still running await the same task and receive its result
+    (or its exception). A cancelled caller does not cancel the shared task.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            'executions': 0,
+            'coalesced': 0,
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` once for all concurrent callers using `key`
+
+        Args:
+            key: Hashable identifier of the computation
+            fn: Zero-argument coroutine function to run
+
+        Returns:
+            Result of the shared computation
+        """
+        task = self._calls.get(key)
+
+        if task is not None:
+            self._stats['coalesced'] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._stats['executions'] += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return the number of computations currently running"""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Return execution/coalescing counters"""
+        return {**self._stats, 'in_flight': len(self._calls)}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a finished task and mark its exception as retrieved"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
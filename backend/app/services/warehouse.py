@@ -0,0 +1,158 @@
+"""
+Warehouse interface and the BigQuery implementation
+
+BigQueryService builds BigQuery-dialect SQL and runs it through a Warehouse,
+so the same queries can be served by BigQuery in production or by the
+embedded local engine (see local_warehouse.py) for development and benchmarks.
+"""
+import concurrent.futures
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+
+
+class Warehouse(ABC):
+    """SQL warehouse holding the activity_logs and agent_metrics tables"""
+
+    project_id: str
+    dataset_id: str
+
+    @abstractmethod
+    def execute(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        job_stats: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run a BigQuery-dialect query and return its results
+
+        Args:
+            query: SQL to run
+            result_format: 'dataframe' (pandas DataFrame), 'rows' (list of dicts),
+                'scalar' (first row as a dict, empty if no rows) or 'arrow'
+                (list of pyarrow RecordBatches, fetched in full)
+            job_stats: If given, filled with queue_seconds, bytes_processed
+                and cache_hit for the job (None where unknown)
+            timeout: Seconds to wait for the query before giving up (default: no limit)
+
+        Returns:
+            Query results in the requested format
+
+        Raises:
+            TimeoutError: The query did not finish within `timeout`
+        """
+
+    @abstractmethod
+    def execute_dml(self, statement: str) -> int:
+        """
+        Run a BigQuery-dialect DDL or DML statement
+
+        Returns:
+            Number of rows affected (0 for DDL)
+        """
+
+    def close(self) -> None:
+        """Release any connections held by the warehouse"""
+
+
+class BigQueryWarehouse(Warehouse):
+    """Google BigQuery warehouse"""
+
+    def __init__(self, project_id: str, dataset_id: str):
+        """Initialize BigQuery client"""
+        from google.cloud import bigquery
+
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.client = bigquery.Client(project=self.project_id)
+        self._bqstorage_client = None
+
+    def execute(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        job_stats: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Run a query as a BigQuery job and return its results, cancelling it on timeout"""
+        query_job = self.client.query(query, timeout=timeout)
+        try:
+            results = query_job.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            # Stop the job so an abandoned query doesn't keep scanning
+            query_job.cancel()
+            raise TimeoutError(f"BigQuery job {query_job.job_id} did not finish within {timeout:.2f}s")
+
+        if job_stats is not None:
+            job_stats.update(self._get_job_stats(query_job))
+
+        if result_format == 'scalar':
+            for row in results:
+                return dict(row.items())
+            return {}
+
+        if result_format == 'rows':
+            return [dict(row.items()) for row in results]
+
+        if result_format == 'arrow':
+            return self._read_arrow_batches(results)
+
+        return results.to_dataframe()
+
+    def execute_dml(self, statement: str) -> int:
+        """Run a DDL/DML statement as a BigQuery job"""
+        query_job = self.client.query(statement)
+        query_job.result()
+        return query_job.num_dml_affected_rows or 0
+
+    def _get_job_stats(self, query_job) -> Dict:
+        """Return queue time, bytes processed and BigQuery cache-hit status of a finished job"""
+        queue_seconds = None
+        if query_job.created and query_job.started:
+            queue_seconds = (query_job.started - query_job.created).total_seconds()
+
+        return {
+            'queue_seconds': queue_seconds,
+            'bytes_processed': query_job.total_bytes_processed,
+            'cache_hit': query_job.cache_hit,
+        }
+
+    def _read_arrow_batches(self, results) -> List:
+        """
+        Fetch all query results as Arrow record batches
+
+        The whole result is read into memory (callers fold it in one pass and
+        count its rows for metrics). When storage reads are enabled it is
+        downloaded through the BigQuery Storage Read API, which is faster than
+        paging over REST for large results.
+        """
+        return list(results.to_arrow_iterable(bqstorage_client=self._get_bqstorage_client()))
+
+    def _get_bqstorage_client(self):
+        """Return a BigQuery Storage Read client if storage reads are enabled and available"""
+        if not settings.bigquery_storage_read_enabled:
+            return None
+
+        if self._bqstorage_client is None:
+            try:
+                from google.cloud import bigquery_storage
+            except ImportError:
+                print("google-cloud-bigquery-storage is not installed; reading results over REST")
+                return None
+            self._bqstorage_client = bigquery_storage.BigQueryReadClient()
+
+        return self._bqstorage_client
+
+
+def create_warehouse() -> Warehouse:
+    """Create the warehouse selected by the WAREHOUSE_BACKEND setting"""
+    if settings.warehouse_backend == 'local':
+        from .local_warehouse import LocalWarehouse
+        return LocalWarehouse(settings.local_warehouse_path)
+
+    if settings.warehouse_backend != 'bigquery':
+        raise ValueError(f"Unknown warehouse backend: {settings.warehouse_backend}")
+
+    return BigQueryWarehouse(settings.gcp_project_id, settings.bigquery_dataset)
@@ -0,0 +1,114 @@
+"""
+Background startup warm-up behind the readiness probe
+
+On startup the warehouse client is created and the common dashboard windows
+are prefetched with one batch scan, so the first viewers hit a warm cache.
+The app accepts connections immediately (liveness stays green), but /ready
+reports not-ready until the warm-up has finished, letting a load balancer
+hold traffic back from a cold instance.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from .metrics import metrics_registry
+
+WARMUP_DURATION = metrics_registry.histogram(
+    "dashboard_warmup_duration_seconds", "Startup warm-up duration by outcome", ["status"]
+)
+
+
+class Warmup:
+    """Connect to the warehouse, then prefetch dashboard windows, in the background"""
+
+    def __init__(
+        self,
+        service,
+        windows: List[int],
+        periods: int = 2,
+        timeout_seconds: float = 120,
+        retry_seconds: float = 10
+    ):
+        """
+        Args:
+            service: BigQueryService to start and warm
+            windows: `days` windows to prefetch
+            periods: Number of metric periods to prefetch for each window
+            timeout_seconds: Longest the prefetch may take before readiness is granted anyway
+            retry_seconds: Delay between attempts to create the warehouse client
+        """
+        self.service = service
+        self.windows = windows
+        self.periods = periods
+        self.timeout_seconds = timeout_seconds
+        self.retry_seconds = retry_seconds
+        self.status = 'pending'
+        self.error: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+
+    def start(self) -> None:
+        """Run the warm-up as a background task"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the warm-up if it is still running"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+
+        # Without a client nothing can be served, so keep retrying
+        self.status = 'connecting'
+        while True:
+            try:
+                await self.service.start()
+                self.error = None
+                break
+            except Exception as e:
+                self.error = str(e)
+                print(f"Error creating warehouse client, retrying in {self.retry_seconds}s: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+        # A failed or slow prefetch only means a colder cache; requests still work
+        self.status = 'warming'
+        outcome = 'ok'
+        if self.windows:
+            try:
+                await asyncio.wait_for(
+                    self.service.get_dashboard_batch(self.windows, periods=self.periods),
+                    timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                self.error = f"Prefetch exceeded {self.timeout_seconds}s"
+                print(f"Dashboard warm-up timed out after {self.timeout_seconds}s")
+            except Exception as e:
+                outcome = 'error'
+                self.error = str(e)
+                print(f"Error warming dashboard cache: {e}")
+
+        self.duration_seconds = time.perf_counter() - started
+        WARMUP_DURATION.observe(self.duration_seconds, status=outcome)
+        self.status = 'ready'
+
+    def readiness(self) -> Dict[str, Any]:
+        """Readiness probe body"""
+        return {
+            'ready': self.ready,
+            'status': self.status,
+            'windows': self.windows,
+            'duration_seconds': round(self.duration_seconds, 3) if self.duration_seconds is not None else None,
+            'error': self.error
+        }
@@ -0,0 +1,277 @@
+"""
+Load-test and latency benchmark for the executive dashboard endpoint
+
+Starts the FastAPI app in-process against a seeded local DuckDB warehouse and
+drives /api/executive/dashboard with a configurable concurrency and `days` mix.
+Reports throughput and latency percentiles of successful requests, errors by
+status and warehouse jobs per request. Results are written as JSON so runs can
+be compared over time.
+
+Usage (from backend/):
+
+    python -m benchmarks.dashboard_benchmark --requests 500 --concurrency 20 \\
+        --days-mix 7:1,30:4,90:2,365:1 --latency-ms 300
+    python -m benchmarks.dashboard_benchmark --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def parse_days_mix(value: str) -> List[Tuple[int, int]]:
+    """Parse '7:1,30:4' into [(7, 1), (30, 4)] (days, weight) pairs"""
+    mix = []
+    for item in value.split(","):
+        days, _, weight = item.partition(":")
+        mix.append((int(days), int(weight or 1)))
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def git_revision() -> Optional[str]:
+    """Return the current git commit, if available"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def build_warehouse(args):
+    """Seed a local warehouse (or reuse --warehouse-path) and wrap it for job counting"""
+    from app.services.local_warehouse import LocalWarehouse
+    from benchmarks.instrumented_warehouse import InstrumentedWarehouse
+
+    path = args.warehouse_path
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="dashboard-bench-"), "bench.duckdb")
+
+    warehouse = LocalWarehouse(path)
+    if args.warehouse_path is None or args.reseed:
+        warehouse.seed(
+            days=args.seed_days,
+            incidents_per_day=args.incidents_per_day,
+            seed=args.seed
+        )
+
+    return InstrumentedWarehouse(warehouse, latency_ms=args.latency_ms)
+
+
+def start_server(app, port: int):
+    """Run the app on a background uvicorn server and wait until it is up"""
+    import uvicorn
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def free_port() -> int:
+    """Return an unused local TCP port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def drive_load(base_url: str, args, warehouse) -> Dict[str, Any]:
+    """Send the configured request mix and collect per-request measurements"""
+    import httpx
+
+    rng = random.Random(args.seed)
+    mix = parse_days_mix(args.days_mix)
+    days_choices = rng.choices([days for days, _ in mix], [weight for _, weight in mix], k=args.requests)
+
+    queue: "asyncio.Queue[int]" = asyncio.Queue()
+    for days in days_choices:
+        queue.put_nowait(days)
+
+    # Successful requests only: fast rejections under overload would pull the percentiles down
+    latencies: List[float] = []
+    latencies_by_days: Dict[int, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        # Measure a ready instance, as a load balancer would route to (WARMUP_ENABLED=false for a cold one)
+        while (await client.get("/ready")).status_code != 200:
+            await asyncio.sleep(0.05)
+
+        for i in range(args.warmup):
+            await client.get("/api/executive/dashboard", params={"days": mix[i % len(mix)][0]})
+
+        jobs_before = warehouse.job_count
+
+        async def worker():
+            while True:
+                try:
+                    days = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/executive/dashboard", params={"days": days})
+                    status = str(response.status_code)
+                except httpx.HTTPError:
+                    status = 'network'
+                elapsed = (time.perf_counter() - started) * 1000
+
+                if status != '200':
+                    errors[status] = errors.get(status, 0) + 1
+                    continue
+                latencies.append(elapsed)
+                latencies_by_days.setdefault(days, []).append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+        wall_seconds = time.perf_counter() - started
+
+    jobs = warehouse.job_count - jobs_before
+    return {
+        'latencies': latencies,
+        'latencies_by_days': latencies_by_days,
+        'errors': errors,
+        'wall_seconds': wall_seconds,
+        'jobs': jobs,
+    }
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    ordered = sorted(latencies)
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 2),
+        'p95_ms': round(percentile(ordered, 95), 2),
+        'p99_ms': round(percentile(ordered, 99), 2),
+        'max_ms': round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def build_report(args, measurements: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble the JSON report for one run"""
+    total = args.requests
+    # Rejected or failed requests return quickly and would inflate throughput
+    succeeded = len(measurements['latencies'])
+    wall_seconds = measurements['wall_seconds']
+    return {
+        'benchmark': 'executive_dashboard',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'config': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'days_mix': args.days_mix,
+            'latency_ms': args.latency_ms,
+            'seed': args.seed,
+            'seed_days': args.seed_days,
+            'incidents_per_day': args.incidents_per_day,
+            'env': {key: value for key, value in os.environ.items() if key.startswith(("CACHE_", "ROLLUP_", "WARMUP_"))},
+        },
+        'results': {
+            'throughput_rps': round(succeeded / wall_seconds, 2) if wall_seconds else 0.0,
+            'errors': sum(measurements['errors'].values()),
+            'errors_by_status': dict(sorted(measurements['errors'].items())),
+            'warehouse_jobs': measurements['jobs'],
+            'jobs_per_request': round(measurements['jobs'] / total, 3) if total else 0.0,
+            'latency': summarize(measurements['latencies']),
+            'latency_by_days': {
+                str(days): summarize(values)
+                for days, values in sorted(measurements['latencies_by_days'].items())
+            },
+        },
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    """Print a run summary, with deltas against a baseline report if given"""
+    results = report['results']
+    base = baseline['results'] if baseline else None
+
+    def line(label: str, value: float, base_value: Optional[float], unit: str = "") -> None:
+        delta = ""
+        if base_value:
+            delta = f"  ({(value - base_value) / base_value * 100:+.1f}% vs baseline)"
+        print(f"  {label:<18}{value:>10}{unit}{delta}")
+
+    print(f"Executive dashboard benchmark ({report['config']['requests']} requests, "
+          f"concurrency {report['config']['concurrency']}, mix {report['config']['days_mix']})")
+    line("throughput", results['throughput_rps'], base and base['throughput_rps'], " req/s")
+    for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+        line(key.replace('_ms', ''), results['latency'][key], base and base['latency'][key], " ms")
+    line("jobs/request", results['jobs_per_request'], base and base['jobs_per_request'])
+    line("errors", results['errors'], None)
+    for status, count in results.get('errors_by_status', {}).items():
+        line(f"  {status}", count, None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /api/executive/dashboard")
+    parser.add_argument("--requests", type=int, default=200, help="Total measured requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients")
+    parser.add_argument("--days-mix", default="7:1,30:4,90:2,365:1", help="days:weight pairs")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured warm-up requests, cycling through the mix")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated round-trip latency per warehouse job")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and request mix")
+    parser.add_argument("--seed-days", type=int, default=400, help="Days of synthetic history")
+    parser.add_argument("--incidents-per-day", type=int, default=300, help="Synthetic incidents per day")
+    parser.add_argument("--warehouse-path", help="Existing DuckDB file to reuse instead of seeding a temporary one")
+    parser.add_argument("--reseed", action="store_true", help="Reseed --warehouse-path before running")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args()
+
+    # The app's default warehouse is replaced below; keep it off disk
+    os.environ["WAREHOUSE_BACKEND"] = "local"
+    os.environ["LOCAL_WAREHOUSE_PATH"] = ":memory:"
+    warehouse = build_warehouse(args)
+
+    from app.main import app
+    from app.services.bigquery_service import bigquery_service
+    bigquery_service.warehouse = warehouse
+
+    server, thread = start_server(app, free_port())
+    try:
+        base_url = f"http://127.0.0.1:{server.config.port}"
+        measurements = asyncio.run(drive_load(base_url, args, warehouse))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    report = build_report(args, measurements)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
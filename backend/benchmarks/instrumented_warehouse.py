@@ -0,0 +1,51 @@
+"""
+Warehouse wrapper that counts jobs and simulates round-trip latency
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.services.warehouse import Warehouse
+
+
+class InstrumentedWarehouse(Warehouse):
+    """Delegate to another warehouse, counting jobs and adding a fixed delay to each"""
+
+    def __init__(self, inner: Warehouse, latency_ms: float = 0.0):
+        """
+        Args:
+            inner: Warehouse that actually runs the queries
+            latency_ms: Delay added to every job, to mimic BigQuery round-trips
+        """
+        self.inner = inner
+        self.project_id = inner.project_id
+        self.dataset_id = inner.dataset_id
+        self.latency_ms = latency_ms
+        self.job_count = 0
+        self._lock = threading.Lock()
+
+    def execute(
+        self,
+        query: str,
+        result_format: str = 'dataframe',
+        job_stats: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """Count the job, wait the simulated latency and run it on the inner warehouse"""
+        self._record_job()
+        return self.inner.execute(query, result_format, job_stats, timeout)
+
+    def execute_dml(self, statement: str) -> int:
+        """Count the job, wait the simulated latency and run it on the inner warehouse"""
+        self._record_job()
+        return self.inner.execute_dml(statement)
+
+    def close(self) -> None:
+        """Close the inner warehouse"""
+        self.inner.close()
+
+    def _record_job(self) -> None:
+        with self._lock:
+            self.job_count += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
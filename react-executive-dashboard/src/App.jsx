@@ -15,7 +15,7 @@ import {
   generateRiskData,
   generateComplianceData
 } from './utils/dataGenerator';
-import { fetchExecutiveDashboard } from './utils/apiClient';
+import { fetchExecutiveDashboard, subscribeExecutiveDashboard } from './utils/apiClient';
 
 function App() {
   const [period, setPeriod] = useState('Last 30 Days');
@@ -27,21 +27,39 @@ function App() {
   const [dataSource, setDataSource] = useState('loading'); // 'api', 'mock', or 'loading'
 
   useEffect(() => {
-    loadDashboardData();
+    let unsubscribe = null;
+    let cancelled = false;
+
+    loadDashboardData().then((fromApi) => {
+      // Keep API-backed dashboards current with server-pushed updates
+      if (fromApi && !cancelled) {
+        unsubscribe = subscribeExecutiveDashboard(30, applyApiData);
+      }
+    });
+
+    return () => {
+      cancelled = true;
+      if (unsubscribe) unsubscribe();
+    };
   }, []);
 
+  const applyApiData = (apiData) => {
+    setMetrics(apiData.metrics);
+    setTrendData(apiData.trendData);
+    setSeverityData(apiData.severityData);
+    setRiskData(apiData.risks);
+    setComplianceData(apiData.compliance);
+    setDataSource('api');
+  };
+
   const loadDashboardData = async () => {
     // Try to fetch from API first
     const apiData = await fetchExecutiveDashboard(30);
 
     if (apiData) {
       // Use real data from API
-      setMetrics(apiData.metrics);
-      setTrendData(apiData.trendData);
-      setSeverityData(apiData.severityData);
-      setRiskData(apiData.risks);
-      setComplianceData(apiData.compliance);
-      setDataSource('api');
+      applyApiData(apiData);
+      return true;
     } else {
       // Fallback to mock data
       const metricsData = generateExecutiveData();
@@ -51,6 +69,7 @@ function App() {
       setRiskData(generateRiskData());
       setComplianceData(generateComplianceData());
       setDataSource('mock');
+      return false;
     }
   };
 
@@ -4,16 +4,35 @@
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Last dashboard received per `days` value: { etag, data }
+const dashboardCache = new Map();
+
 export const fetchExecutiveDashboard = async (days = 30) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/executive/dashboard?days=${days}`);
+    const cached = dashboardCache.get(days);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+
+    // Revalidate ourselves so an unchanged dashboard is neither downloaded nor re-parsed.
+    // Columnar layout sends trend and severity points as parallel arrays (smaller, faster to parse)
+    const response = await fetch(`${API_BASE_URL}/api/executive/dashboard?days=${days}&layout=columnar`, {
+      headers,
+      cache: 'no-store',
+    });
+
+    if (response.status === 304 && cached) {
+      return cached.data;
+    }
 
     if (!response.ok) {
       throw new Error(`API Error: ${response.status} ${response.statusText}`);
     }
 
-    const data = await response.json();
-    return transformAPIResponse(data);
+    const data = transformAPIResponse(await response.json());
+    const etag = response.headers.get('ETag');
+    if (etag) {
+      dashboardCache.set(days, { etag, data });
+    }
+    return data;
   } catch (error) {
     console.error('Error fetching dashboard data:', error);
     // Return null to trigger fallback to mock data
@@ -21,6 +40,97 @@ export const fetchExecutiveDashboard = async (days = 30) => {
   }
 };
 
+/**
+ * Subscribe to live dashboard updates over Server-Sent Events
+ *
+ * The server sends a full snapshot first and then only the sections that
+ * changed; each is merged into the last known dashboard before `onUpdate`
+ * is called with the complete, transformed dashboard.
+ *
+ * @returns {() => void} Function that closes the stream
+ */
+export const subscribeExecutiveDashboard = (days = 30, onUpdate) => {
+  const source = new EventSource(`${API_BASE_URL}/api/executive/stream?days=${days}`);
+  let dashboard = null;
+  let closed = false;
+
+  const emit = () => onUpdate(transformAPIResponse(dashboard));
+
+  // Replace the whole trend with a fresh copy, for deltas that can't be merged
+  const reloadTrend = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/executive/trend?days=${days}`, { cache: 'no-store' });
+      if (!response.ok) {
+        throw new Error(`API Error: ${response.status} ${response.statusText}`);
+      }
+      const trendData = await response.json();
+      if (closed || !dashboard) return;
+      dashboard = { ...dashboard, trend_data: trendData };
+      emit();
+    } catch (error) {
+      console.error('Error reloading trend data:', error);
+    }
+  };
+
+  source.addEventListener('snapshot', (event) => {
+    dashboard = JSON.parse(event.data);
+    emit();
+  });
+
+  ['metrics', 'severity_data'].forEach((section) => {
+    source.addEventListener(section, (event) => {
+      if (!dashboard) return;
+      dashboard = { ...dashboard, [section]: JSON.parse(event.data) };
+      emit();
+    });
+  });
+
+  source.addEventListener('trend_data', (event) => {
+    if (!dashboard) return;
+    const { start, end, points } = JSON.parse(event.data);
+    const updates = new Map(points.map((point) => [point.date, point]));
+
+    // Dates are display labels ('Oct 16'), so keep server order: drop days
+    // before `start`, replace changed days in place, append new days, cut after `end`
+    const startIndex = dashboard.trend_data.findIndex((point) => point.date === start);
+    if (startIndex < 0) {
+      // The window start isn't in the series we hold (e.g. events were missed),
+      // so the delta can't be placed: refetch the trend rather than drop points
+      reloadTrend();
+      return;
+    }
+    let trendData = dashboard.trend_data.slice(startIndex)
+      .map((point) => updates.get(point.date) || point);
+    const known = new Set(trendData.map((point) => point.date));
+    trendData = trendData.concat(points.filter((point) => !known.has(point.date)));
+    const endIndex = trendData.findIndex((point) => point.date === end);
+    if (endIndex >= 0) {
+      trendData = trendData.slice(0, endIndex + 1);
+    }
+
+    dashboard = { ...dashboard, trend_data: trendData };
+    emit();
+  });
+
+  return () => {
+    closed = true;
+    source.close();
+  };
+};
+
+/**
+ * Expand a columnar section ({ field: [values...] }) into a list of points;
+ * sections already sent as lists are returned unchanged
+ */
+const toRows = (section) => {
+  if (Array.isArray(section) || !section) return section;
+  const fields = Object.keys(section);
+  const length = fields.length ? section[fields[0]].length : 0;
+  return Array.from({ length }, (_, index) =>
+    Object.fromEntries(fields.map((field) => [field, section[field][index]]))
+  );
+};
+
 /**
  * Transform API response to match the format expected by React components
  */
@@ -38,6 +148,11 @@ const transformAPIResponse = (apiData) => {
         mttr: apiData.metrics.current.mttr,
         mttd: apiData.metrics.current.mttd,
         mttrResolve: apiData.metrics.current.mttr_resolve,
+        responseTimeP50: apiData.metrics.current.response_time_p50,
+        responseTimeP90: apiData.metrics.current.response_time_p90,
+        responseTimeP99: apiData.metrics.current.response_time_p99,
+        uniqueSourceIps: apiData.metrics.current.unique_source_ips,
+        uniqueAssets: apiData.metrics.current.unique_assets,
       },
       previous: {
         totalIncidents: apiData.metrics.previous.total_incidents,
@@ -50,10 +165,15 @@ const transformAPIResponse = (apiData) => {
         mttr: apiData.metrics.previous.mttr,
         mttd: apiData.metrics.previous.mttd,
         mttrResolve: apiData.metrics.previous.mttr_resolve,
+        responseTimeP50: apiData.metrics.previous.response_time_p50,
+        responseTimeP90: apiData.metrics.previous.response_time_p90,
+        responseTimeP99: apiData.metrics.previous.response_time_p99,
+        uniqueSourceIps: apiData.metrics.previous.unique_source_ips,
+        uniqueAssets: apiData.metrics.previous.unique_assets,
       },
     },
-    trendData: apiData.trend_data,
-    severityData: apiData.severity_data,
+    trendData: toRows(apiData.trend_data),
+    severityData: toRows(apiData.severity_data),
     risks: apiData.risks,
     compliance: apiData.compliance,
     generatedAt: apiData.generated_at,